@@ -1,6 +1,7 @@
 
 
 #Global imports
+import os
 import math
 from enum import Enum
 from shapely.geometry import LineString
@@ -8,14 +9,22 @@ from shapely.geometry import LineString
 #Local modules
 from pkg.time_keeping					import time_keeping as tk
 from pkg.poly_operations.hard_coded_lib import polygon_library
-from pkg.poly_operations.others			import adjacency
+from pkg.decompositions					import adjacency
 from pkg.decompositions.greedy 			import greedy_decompose
 from pkg.decompositions.min_alt			import min_alt_decompose
 from pkg.discritizers.line 				import min_alt_discrt
+from pkg.discritizers.line 				import collinear_merge
+from pkg.aux.altitudes					import altitude_cache
 from pkg.discritizers.point 			import point_discrt
 from pkg.discritizers	 				import get_mapping
 from pkg.costs							import dubins_cost
+from pkg.costs							import cost_cache
+from pkg.aux.cache						import npz_cache
 from pkg.gtsp.GLKH						import solver
+from pkg.gtsp.GLKH						import portfolio
+from pkg.gtsp.native					import solver as native_solver
+from pkg.gtsp							import hierarchical
+from pkg.gtsp							import direction_dp
 from pkg.visuals.static					import coverage_plot as splot
 from pkg.analysis						import tour_length
 from pkg.analysis						import tour_area
@@ -33,6 +42,45 @@ class Robot:
 
 GLKH_LOCATION = "/home/sbochkar/misc/GLKH-1.0/"
 
+# Folder of the planner, files written by the planner are placed relative to it
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Wall-clock limit of a single GLKH run in seconds
+GLKH_TIMEOUT = 600
+
+# GTSP solver used by the planner, "GLKH", a "portfolio" of GLKH
+# configurations or the in-process "native" one
+GTSP_SOLVER = "GLKH"
+
+# Wall-clock budget of the native solver in seconds
+NATIVE_TIME_BUDGET = 10.0
+
+# Wall-clock budget of the portfolio in seconds and the log of its results
+PORTFOLIO_DEADLINE = 60
+PORTFOLIO_LOG = os.path.join(BASE_DIR, "pkg", "gtsp", "solver_logs", "portfolio.log")
+
+# Number of processes discritizing the cells, None uses every core
+DISCRT_WORKERS = 1
+
+# Fuse line segments continuing each other across neighbouring cells
+MERGE_COLLINEAR = False
+
+# Number of processes used for the cost matrix, None uses every core
+COST_WORKERS = 1
+
+# Number of processes solving the cells of the hierarchical method
+CELL_WORKERS = 1
+
+# Per-user folder of the on-disk caches, kept out of the source tree
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+	"coverage_path_planning")
+
+# On-disk cache of cost matrices shared by all runs
+COST_CACHE = npz_cache.NpzCache(os.path.join(CACHE_DIR, "cost_cache"))
+
+# On-disk cache of GLKH tours shared by all runs
+SOLVER_CACHE = npz_cache.NpzCache(os.path.join(CACHE_DIR, "solver_cache"))
+
 
 def coverage_path_planner(map_num, robot, method):
 	"""
@@ -63,24 +111,45 @@ def coverage_path_planner(map_num, robot, method):
 		print("[%18s] Adjacency matrix complete."%tk.current_time())
 
 		print("[%18s] Populating the free space with segments."%tk.current_time())
-		segments = min_alt_discrt.discritize_set(decomposition, width)
-		print("[%18s] Finished generating segments."%tk.current_time())
+		cells = min_alt_discrt.discritize_cells(decomposition, width, DISCRT_WORKERS)
+		print("[%18s] Finished generating segments. Altitude cache hits: %d, misses: %d, hit rate: %.2f."%((tk.current_time(),)+altitude_cache.get_stats()))
+
+		segments = []
+		for cell in cells:
+			segments.extend(cell)
+
+		if MERGE_COLLINEAR:
+			print("[%18s] Merging collinear segments across cells."%tk.current_time())
+			num_segments = len(segments)
+			segments = collinear_merge.merge_cells(cells, adjacency_matrix, width)
+			print("[%18s] Merged %d segments into %d."%(tk.current_time(), num_segments, len(segments)))
 
 		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
-		mapping = get_mapping.get_mapping(segments)
+		mapping = get_mapping.get_segment_array(segments)
 		print("[%18s] Obtained mapping."%tk.current_time())
 
 		print("[%18s] Started computing the cost matrix."%tk.current_time())
-		cost_matrix, cluster_list = dubins_cost.compute_costs(P, mapping, width/2)
-		print("[%18s] Finished computing the cost matrix."%tk.current_time())
+		cost_matrix, cluster_list = cost_cache.compute_costs(COST_CACHE, P, mapping, width/2, workers=COST_WORKERS)
+		print("[%18s] Finished computing the cost matrix. Cache hits: %d, misses: %d."%(tk.current_time(), COST_CACHE.hits, COST_CACHE.misses))
 
 		print("[%18s] Generating and launching GTSP instance."%tk.current_time())
-		solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list)
-		print("[%18s] Sovled GTSP instance."%tk.current_time())
-
-
-		print("[%18s] Reading the results."%tk.current_time())
-		tour = solver.read_tour("cpp_test")
+		if GTSP_SOLVER == "native":
+			tour = native_solver.solve(cost_matrix, cluster_list, NATIVE_TIME_BUDGET)
+			print("[%18s] Sovled GTSP instance."%tk.current_time())
+		elif GTSP_SOLVER == "portfolio":
+			tour, settings = portfolio.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list,
+				PORTFOLIO_DEADLINE, log_file=PORTFOLIO_LOG)
+			if tour is None:
+				print("[%18s] No portfolio run left a tour, see %s. Falling back to a single GLKH run."%(tk.current_time(), PORTFOLIO_LOG))
+				tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Best settings: %s"%(tk.current_time(), settings))
+		else:
+			tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Cache hits: %d, misses: %d."%(tk.current_time(), SOLVER_CACHE.hits, SOLVER_CACHE.misses))
+
+		print("[%18s] Re-assigning directions along the tour."%tk.current_time())
+		tour = direction_dp.optimize_directions(tour, cost_matrix, cluster_list)
+		print("[%18s] Directions re-assigned."%tk.current_time())
 
 		print("[%18s] Plotting the results."%tk.current_time())		
 		ax = splot.init_axis()
@@ -111,24 +180,45 @@ def coverage_path_planner(map_num, robot, method):
 		print("[%18s] Adjacency matrix complete."%tk.current_time())
 
 		print("[%18s] Populating the free space with segments."%tk.current_time())
-		segments = min_alt_discrt.discritize_set(decomposition, width)
-		print("[%18s] Finished generating segments."%tk.current_time())
+		cells = min_alt_discrt.discritize_cells(decomposition, width, DISCRT_WORKERS)
+		print("[%18s] Finished generating segments. Altitude cache hits: %d, misses: %d, hit rate: %.2f."%((tk.current_time(),)+altitude_cache.get_stats()))
+
+		segments = []
+		for cell in cells:
+			segments.extend(cell)
+
+		if MERGE_COLLINEAR:
+			print("[%18s] Merging collinear segments across cells."%tk.current_time())
+			num_segments = len(segments)
+			segments = collinear_merge.merge_cells(cells, adjacency_matrix, width)
+			print("[%18s] Merged %d segments into %d."%(tk.current_time(), num_segments, len(segments)))
 
 		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
-		mapping = get_mapping.get_mapping(segments)
+		mapping = get_mapping.get_segment_array(segments)
 		print("[%18s] Obtained mapping."%tk.current_time())
 
 		print("[%18s] Started computing the cost matrix."%tk.current_time())
-		cost_matrix, cluster_list = dubins_cost.compute_costs(P, mapping, width/2)
-		print("[%18s] Finished computing the cost matrix."%tk.current_time())
+		cost_matrix, cluster_list = cost_cache.compute_costs(COST_CACHE, P, mapping, width/2, workers=COST_WORKERS)
+		print("[%18s] Finished computing the cost matrix. Cache hits: %d, misses: %d."%(tk.current_time(), COST_CACHE.hits, COST_CACHE.misses))
 
 		print("[%18s] Generating and launching GTSP instance."%tk.current_time())
-		solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list)
-		print("[%18s] Sovled GTSP instance."%tk.current_time())
-
-
-		print("[%18s] Reading the results."%tk.current_time())
-		tour = solver.read_tour("cpp_test")
+		if GTSP_SOLVER == "native":
+			tour = native_solver.solve(cost_matrix, cluster_list, NATIVE_TIME_BUDGET)
+			print("[%18s] Sovled GTSP instance."%tk.current_time())
+		elif GTSP_SOLVER == "portfolio":
+			tour, settings = portfolio.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list,
+				PORTFOLIO_DEADLINE, log_file=PORTFOLIO_LOG)
+			if tour is None:
+				print("[%18s] No portfolio run left a tour, see %s. Falling back to a single GLKH run."%(tk.current_time(), PORTFOLIO_LOG))
+				tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Best settings: %s"%(tk.current_time(), settings))
+		else:
+			tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Cache hits: %d, misses: %d."%(tk.current_time(), SOLVER_CACHE.hits, SOLVER_CACHE.misses))
+
+		print("[%18s] Re-assigning directions along the tour."%tk.current_time())
+		tour = direction_dp.optimize_directions(tour, cost_matrix, cluster_list)
+		print("[%18s] Directions re-assigned."%tk.current_time())
 
 		print("[%18s] Plotting the results."%tk.current_time())		
 		ax = splot.init_axis()
@@ -154,11 +244,11 @@ def coverage_path_planner(map_num, robot, method):
 		print("[%18s] Finished generating segments."%tk.current_time())
 
 		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
-		mapping = get_mapping.get_mapping(segments)
+		mapping = get_mapping.get_segment_array(segments)
 		print("[%18s] Obtained mapping."%tk.current_time())
 
 		print("[%18s] Started computing the cost matrix."%tk.current_time())
-#		cost_matrix, cluster_list = dubins_cost.compute_costs(P, mapping, width/2)
+#		cost_matrix, cluster_list = dubins_cost.compute_costs(P, mapping, width/2, COST_WORKERS)
 		print("[%18s] Finished computing the cost matrix."%tk.current_time())
 
 		print("[%18s] Generating and launching GTSP instance."%tk.current_time())
@@ -208,6 +298,13 @@ def coverage_path_planner(map_num, robot, method):
 		adjacency_matrix = adjacency.get_adjacency_as_matrix(decomposition)
 		print("[%18s] Adjacency matrix complete."%tk.current_time())
 
+		# Costs of the greedy cells, usually cached by method 0, are carried
+		# over to the cells the reoptimization leaves untouched
+		print("[%18s] Computing the cost matrix of the greedy decomposition."%tk.current_time())
+		greedy_mapping = get_mapping.get_segment_array(min_alt_discrt.discritize_set(decomposition, width, DISCRT_WORKERS))
+		greedy_cost, _ = cost_cache.compute_costs(COST_CACHE, P, greedy_mapping, width/2, workers=COST_WORKERS)
+		print("[%18s] Finished computing the cost matrix. Cache hits: %d, misses: %d."%(tk.current_time(), COST_CACHE.hits, COST_CACHE.misses))
+
 
 		print("[%18s] Forming an adjacency matrix for polygons."%tk.current_time())
 		decomposition = min_alt_decompose.reoptimize(P, decomposition, adjacency_matrix)
@@ -219,24 +316,45 @@ def coverage_path_planner(map_num, robot, method):
 
 
 		print("[%18s] Populating the free space with segments."%tk.current_time())
-		segments = min_alt_discrt.discritize_set(decomposition, width)
-		print("[%18s] Finished generating segments."%tk.current_time())
+		cells = min_alt_discrt.discritize_cells(decomposition, width, DISCRT_WORKERS)
+		print("[%18s] Finished generating segments. Altitude cache hits: %d, misses: %d, hit rate: %.2f."%((tk.current_time(),)+altitude_cache.get_stats()))
+
+		segments = []
+		for cell in cells:
+			segments.extend(cell)
+
+		if MERGE_COLLINEAR:
+			print("[%18s] Merging collinear segments across cells."%tk.current_time())
+			num_segments = len(segments)
+			segments = collinear_merge.merge_cells(cells, adjacency_matrix, width)
+			print("[%18s] Merged %d segments into %d."%(tk.current_time(), num_segments, len(segments)))
 
 		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
-		mapping = get_mapping.get_mapping(segments)
+		mapping = get_mapping.get_segment_array(segments)
 		print("[%18s] Obtained mapping."%tk.current_time())
 
-		print("[%18s] Started computing the cost matrix."%tk.current_time())
-		cost_matrix, cluster_list = dubins_cost.compute_costs(P, mapping, width/2)
-		print("[%18s] Finished computing the cost matrix."%tk.current_time())
+		print("[%18s] Updating the cost matrix."%tk.current_time())
+		cost_matrix, cluster_list = cost_cache.update_costs(COST_CACHE, P, greedy_mapping, mapping, greedy_cost, width/2)
+		print("[%18s] Finished updating the cost matrix. Cache hits: %d, misses: %d."%(tk.current_time(), COST_CACHE.hits, COST_CACHE.misses))
 
 		print("[%18s] Generating and launching GTSP instance."%tk.current_time())
-		solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list)
-		print("[%18s] Sovled GTSP instance."%tk.current_time())
-
-
-		print("[%18s] Reading the results."%tk.current_time())
-		tour = solver.read_tour("cpp_test")
+		if GTSP_SOLVER == "native":
+			tour = native_solver.solve(cost_matrix, cluster_list, NATIVE_TIME_BUDGET)
+			print("[%18s] Sovled GTSP instance."%tk.current_time())
+		elif GTSP_SOLVER == "portfolio":
+			tour, settings = portfolio.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list,
+				PORTFOLIO_DEADLINE, log_file=PORTFOLIO_LOG)
+			if tour is None:
+				print("[%18s] No portfolio run left a tour, see %s. Falling back to a single GLKH run."%(tk.current_time(), PORTFOLIO_LOG))
+				tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Best settings: %s"%(tk.current_time(), settings))
+		else:
+			tour = solver.solve("cpp_test", GLKH_LOCATION, cost_matrix, cluster_list, GLKH_TIMEOUT, cache=SOLVER_CACHE)
+			print("[%18s] Sovled GTSP instance. Cache hits: %d, misses: %d."%(tk.current_time(), SOLVER_CACHE.hits, SOLVER_CACHE.misses))
+
+		print("[%18s] Re-assigning directions along the tour."%tk.current_time())
+		tour = direction_dp.optimize_directions(tour, cost_matrix, cluster_list)
+		print("[%18s] Directions re-assigned."%tk.current_time())
 
 
 		print("[%18s] Plotting the results."%tk.current_time())		
@@ -263,7 +381,7 @@ def coverage_path_planner(map_num, robot, method):
 		print("[%18s] Finished generating segments."%tk.current_time())
 
 		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
-		mapping = get_mapping.get_mapping(segments)
+		mapping = get_mapping.get_segment_array(segments)
 		print("[%18s] Obtained mapping."%tk.current_time())
 
 		print("[%18s] Reading the results."%tk.current_time())
@@ -286,6 +404,45 @@ def coverage_path_planner(map_num, robot, method):
 
 		splot.display()
 
+	elif method == 5: # Hierarchical solution over the min_alt decomposition
+		print("[%18s] Invoking min_alt decomposition."%tk.current_time())
+		decomposition = min_alt_decompose.decompose(P)
+		print("[%18s] Finished min_alt decomposition."%tk.current_time())
+
+		print("[%18s] Forming an adjacency matrix for polygons."%tk.current_time())
+		adjacency_matrix = adjacency.get_adjacency_as_matrix(decomposition)
+		print("[%18s] Adjacency matrix complete."%tk.current_time())
+
+		print("[%18s] Populating the free space with segments."%tk.current_time())
+		cells = min_alt_discrt.discritize_cells(decomposition, width, DISCRT_WORKERS)
+		segments = [segment for cell in cells for segment in cell]
+		print("[%18s] Finished generating segments. Altitude cache hits: %d, misses: %d, hit rate: %.2f."%((tk.current_time(),)+altitude_cache.get_stats()))
+
+		print("[%18s] Obtain a mapping between nodes and segments."%tk.current_time())
+		mapping = get_mapping.get_segment_array(segments)
+		print("[%18s] Obtained mapping."%tk.current_time())
+
+		print("[%18s] Solving the cells in order."%tk.current_time())
+		tour = hierarchical.solve(P, decomposition, adjacency_matrix, cells, width/2,
+			workers=CELL_WORKERS)
+		print("[%18s] Sovled GTSP instance."%tk.current_time())
+
+		print("[%18s] Plotting the results."%tk.current_time())
+		ax = splot.init_axis()
+
+		print("[%18s] Plotting decomposition."%tk.current_time())
+		splot.plot_decomposition(ax, decomposition, adjacency_matrix, P)
+
+		print("[%18s] Plotting sampling."%tk.current_time())
+		splot.plot_samples(ax, segments)
+
+		print("[%18s] Plotting path."%tk.current_time())
+		splot.plot_tour_dubins(ax, tour, mapping, width/2)
+
+		splot.display()
+		print("Polygon Area: %2f"%tour_area.polygon_area(P))
+		print("Area covered: %2f"%tour_area.covered_area(tour, mapping, width/2))
+
 if __name__ == "__main__":
 
 	robot = Robot(0.2, "dubins")
@@ -1,3 +1,4 @@
+import numpy as np
 from shapely.geometry import Polygon
 from shapely.geometry import Point
 from shapely.geometry import LineString
@@ -10,6 +11,9 @@ def covered_area(tour, mapping, r):
 	Function will print info about the path
 	"""
 
+	if isinstance(mapping, classes.SegmentArray):
+		return _covered_area_array(tour, mapping, r)
+
 	if isinstance(mapping[tour[0]][0], classes.PointSegment):
 		coord = mapping[tour[0]][0].coord
 		seg = Point(coord)
@@ -39,6 +43,27 @@ def covered_area(tour, mapping, r):
 	#return total_area.area
 	return segment_area.area
 
+
+def _covered_area_array(tour, mapping, r):
+	"""
+	covered_area over a SegmentArray, every segment of the tour is buffered
+	once and all of them are merged in a single union
+	"""
+
+	segment_ids = np.unique(mapping.segment_ids[tour])
+
+	buffers = []
+	for k in segment_ids.tolist():
+		start = tuple(mapping.starts[k].tolist())
+		end = tuple(mapping.ends[k].tolist())
+
+		if mapping.kinds[k] == mapping.POINT:
+			buffers.append(Point(start).buffer(r+0.00001))
+		else:
+			buffers.append(LineString([start, end]).buffer(r+0.00001))
+
+	return cascaded_union(buffers).area
+
 def polygon_area(P):
 
 	Poly = Polygon(*P)
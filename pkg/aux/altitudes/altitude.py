@@ -1,34 +1,92 @@
+import numpy as np
+
+
+# Relative tolerance under which two altitudes count as equal
+TIE_TOLERANCE = 1e-9
 
 
 def get_min_altitude(P):
 	"""
-	Function perofrm a series of call to get_altitude, to find the min altitude
-	Things to look out for:
-		min_alt init value might not be high ebough
+	Function finds the direction of minimum altitude of P
+
+	The altitude is half the sum of |e.d| over all edges e, a sum of
+	absolute sinusoids in the direction angle. Between two directions
+	orthogonal to edges no term changes sign, so the function is a single
+	non-negative sinusoid there and therefore concave. Its minimum over the
+	circle thus lies at one of the edge normals, which are all evaluated at
+	once. Ties go to the last normal, as in the direction set order.
+
+	Args:
+		P: polygon in the standard form
 
+	Returns:
+		min_alt: The minimum altitude
+		min_dir: Direction of the minimum altitude [rad]
 	"""
 
 	dirs = directions.get_directions_set(P)
+	alts = get_altitudes(P, dirs)
+
+	min_alt = alts.min()
+	idx = np.nonzero(alts <= min_alt + TIE_TOLERANCE*abs(min_alt))[0][-1]
+
+	return float(alts[idx]), dirs[idx]
+
+
+def get_min_altitude_batch(D):
+	"""
+	Minimum altitudes and their directions for a whole set of polygons.
+
+	The edges of all polygons are packed into one ragged array with
+	offsets. Every edge normal is paired with every edge of its own
+	polygon, and all pairs are evaluated in a single vectorized pass. The
+	result matches get_min_altitude applied to each polygon.
+
+	Args:
+		D: list of polygons in the standard form
+
+	Returns:
+		altitudes: ndarray of minimum altitudes, one per polygon
+		thetas: ndarray of their directions [rad]
+	"""
+
+	if not len(D):
+		return np.zeros(0), np.zeros(0)
+
+	vectors = [get_edge_vectors(P) for P in D]
+	sizes = np.array([len(v) for v in vectors])
+	offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+	edge_vectors = np.concatenate(vectors)
+
+	# The candidate directions are the edge normals, in get_directions_set order
+	thetas = np.arctan2(edge_vectors[:, 1], edge_vectors[:, 0]) + np.pi/2
+	dirs = np.column_stack((np.cos(thetas), np.sin(thetas)))
 
-	min_alt = 1000000000
-	min_dir = 0
-	for theta in dirs:
-		test_alt = get_altitude(P, theta)
-		if test_alt <= min_alt:
-			min_alt = test_alt
-			min_dir = theta
+	# Pair every candidate with every edge of its polygon
+	cell_of = np.repeat(np.arange(len(D)), sizes)
+	pair_sizes = sizes[cell_of]
+	candidates = np.repeat(np.arange(len(thetas)), pair_sizes)
+	starts = np.repeat(np.cumsum(pair_sizes)-pair_sizes, pair_sizes)
+	edges = offsets[cell_of[candidates]] + np.arange(len(candidates)) - starts
 
-	return min_alt, min_dir
+	products = np.abs(np.einsum('ij,ij->i', edge_vectors[edges], dirs[candidates]))
+	alts = 0.5*np.bincount(candidates, weights=products, minlength=len(thetas))
+
+	# Last candidate within the tie tolerance of its polygon minimum
+	min_alts = np.minimum.reduceat(alts, offsets)
+	ties = alts <= (min_alts + TIE_TOLERANCE*np.abs(min_alts))[cell_of]
+	best = np.maximum.reduceat(np.where(ties, np.arange(len(alts)), -1), offsets)
+
+	return alts[best], thetas[best]
 
 
 def get_altitude(P, theta):
 	"""
 	Compute theta altitude of polygon P.
 
-	Rotate the polygon to align sweep with the x-axis.
-	Sort all vertices of the polygon by x-coordinate.
-	Keep the counter of active corridors.
-	Sum up the lengths between events scaled by the counter.
+	The sweep line perpendicular to theta crosses the boundary an even
+	number of times and covers half as many corridors. Integrated along the
+	sweep this is half the total length of the edges projected onto theta.
 
 	Args:
 		P: polygon specified in the form of a tuple (ext, [int]). ext is a list
@@ -38,104 +96,56 @@ def get_altitude(P, theta):
 
 	Returns:
 		altitude: A scalar value of the altitude
-	"""	
-
-	#print("Starting with theta:%f\n"%theta)
-	P = rotation.rotate_polygon(P, -theta)
-	adj = ae.get_edge_adjacency_as_dict(P)
-
-	# Sort by x-coordinate
-	sorted_by_x = sorted(adj.keys(), key=lambda pt: pt[1][0])
-	#print("Sorted list of points: %s"%(sorted_by_x,))
-
-	altitude = 0
-	active_event_counter = 0
-	prev_x = -10000000
-	checked_verts = []
-	for i in range(len(sorted_by_x)):
-			
-		v = sorted_by_x[i]
-
-		if v in checked_verts:
-			continue
-
-		x_v, y_v = v[1]
-		x_adj_1, y_adj_1 = adj[v][0][1]
-		x_adj_2, y_adj_2 = adj[v][1][1]
-		#print("Current : %s"%(v,))	
-		#print("Next adj: %s"%((x_adj_1, y_adj_1),))	
-		#print("Prev adj: %s"%((x_adj_2, y_adj_2),))	
-		#print("%d, %5f, %s"%(active_event_counter, altitude,v))
-
-		# Increment the altitude accordingly
-		if i>0:
-			deltax = x_v-prev_x
-			altitude += active_event_counter*deltax
-		prev_x = x_v
-
-		# Handle the easy clear cut cases here
-		if (x_adj_1 > x_v) and (x_adj_2 > x_v):
-			active_event_counter += 1
-		elif (x_adj_1 < x_v) and (x_adj_2 < x_v):
-			active_event_counter -= 1
-
-		# Handle the cases when some edges are parallel to sweep line
-		if (x_adj_1 > x_v) and (x_adj_2 == x_v):
-			if resolve_local_equality(adj, adj[v][1], v) == 1:
-				active_event_counter += 1
-				checked_verts.append(adj[v][1])
-		if (x_adj_2 > x_v) and (x_adj_1 == x_v):
-			if resolve_local_equality(adj, adj[v][0], v) == 1:
-				active_event_counter += 1
-				checked_verts.append(adj[v][0])
-		if (x_adj_1 < x_v) and (x_adj_2 == x_v):
-			if resolve_local_equality(adj, adj[v][1], v) == -1:
-				active_event_counter -= 1
-				checked_verts.append(adj[v][1])
-		if (x_adj_2 < x_v) and (x_adj_1 == x_v):
-			if resolve_local_equality(adj, adj[v][0], v) == -1:
-				active_event_counter -= 1
-				checked_verts.append(adj[v][0])
-
-#		print("Test point: (%f, %f)"%(current_x, current_y))
-#		print("Adj1 point: (%f, %f)"%(adjacent_x_1, adjacent_y_1))
-#		print("Adj2 point: (%f, %f)"%(adjacent_x_2, adjacent_y_2))
-#		print("Counter: %d"%active_event_counter)
-#		print("Altitude: %f"%altitude)
-	return altitude
-
-
-def resolve_local_equality(adj_list, v, prev):
 	"""
-	Recursivley resolve which side the edges lie on
+
+	return float(get_altitudes(P, [theta])[0])
+
+
+def get_altitudes(P, thetas):
+	"""
+	Compute the altitudes of polygon P for several directions at once.
+
+	Args:
+		P: polygon in the standard form
+		thetas: sequence of angles with respect to x-axis
+
+	Returns:
+		altitudes: ndarray of altitudes, one per angle
+	"""
+
+	edge_vectors = get_edge_vectors(P)
+
+	thetas = np.asarray(thetas, dtype=float)
+	dirs = np.column_stack((np.cos(thetas), np.sin(thetas)))
+
+	return 0.5*np.abs(np.dot(edge_vectors, dirs.T)).sum(axis=0)
+
+
+def get_edge_vectors(P):
 	"""
+	Collect the edges of the exterior and holes of P as vectors
+
+	Args:
+		P: polygon in the standard form
 
-	adj = [adj_list[v][0], adj_list[v][1]]
-	
-	if prev in adj:
-		adj.remove(prev)
+	Returns:
+		vectors: (n, 2) ndarray of edge vectors
+	"""
 
-	x_v, x_y = v[1]
-	x, y = adj[0][1]
+	vectors = []
+	for ring in [P[0]]+list(P[1]):
+		ring = np.asarray(ring, dtype=float).reshape(-1, 2)
+		vectors.append(np.roll(ring, -1, axis=0)-ring)
 
-	if x > x_v:
-		return 1
-	elif x < x_v:
-		return -1
-	else:
-		return resolve_local_equality(adj_list, adj[0], v)
+	return np.concatenate(vectors)
 
 
 if __name__ == '__main__':
 	if __package__ is None:
 		import os, sys
 		sys.path.insert(0, os.path.abspath("../.."))
-		from aux.geometry import rotation
-		from poly_operations.others import adjacency_edges as ae
 		from poly_operations.others import directions
 else:
-	from ...aux.geometry import rotation
-	from ...poly_operations.others import adjacency_edges as ae
 	from ...poly_operations.others import directions
 
 #print get_min_altitude(([[(0,0),(2,0),(2,1),(0,1)], []]))
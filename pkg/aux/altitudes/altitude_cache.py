@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from math import pi
+import numpy as np
+
+
+# Default number of entries kept by a cache
+DEFAULT_MAX_SIZE = 4096
+
+# Decimals coordinates and angles are rounded to in the keys
+DECIMALS = 9
+
+
+class AltitudeCache:
+	"""
+	Least recently used cache of polygon altitudes.
+
+	Polygons are keyed by their canonical form, so the same polygon hits the
+	cache no matter where its rings start or which way they run. Altitudes
+	are computed on the canonical form as well, a cached result therefore
+	never depends on which of the equal polygons was seen first.
+	"""
+
+	def __init__(self, max_size=DEFAULT_MAX_SIZE):
+		"""
+		:param max_size: Upper bound on the number of entries
+		"""
+
+		self.max_size = max_size
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get_min_altitude(self, P):
+		"""
+		Cached altitude.get_min_altitude
+		"""
+
+		canonical = canonical_form(P)
+		return self._lookup(('min', canonical), altitude.get_min_altitude, canonical)
+
+	def get_min_altitude_batch(self, D):
+		"""
+		Cached altitude.get_min_altitude_batch, the polygons missing from the
+		cache are evaluated together in one batch
+		"""
+
+		keys = [('min', canonical_form(P)) for P in D]
+
+		results = {}
+		missing = []
+		for key in keys:
+			if key in results:
+				self.hits += 1
+			elif key in self.entries:
+				results[key] = self._touch(key)
+				self.hits += 1
+			else:
+				results[key] = None
+				missing.append(key)
+				self.misses += 1
+
+		if missing:
+			alts, thetas = altitude.get_min_altitude_batch([key[1] for key in missing])
+			for key, alt, theta in zip(missing, alts, thetas):
+				results[key] = (float(alt), float(theta))
+				self._store(key, results[key])
+
+		alts = np.array([results[key][0] for key in keys])
+		thetas = np.array([results[key][1] for key in keys])
+		return alts, thetas
+
+	def get_altitude(self, P, theta):
+		"""
+		Cached altitude.get_altitude. Directions theta and theta+pi give the
+		same altitude and share an entry.
+		"""
+
+		canonical = canonical_form(P)
+		key = ('alt', canonical, round(theta % pi, DECIMALS) % pi)
+		return self._lookup(key, altitude.get_altitude, canonical, theta)
+
+	def hit_rate(self):
+		lookups = self.hits + self.misses
+		if not lookups:
+			return 0.0
+		return float(self.hits)/lookups
+
+	def clear(self):
+		self.entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def _lookup(self, key, func, *args):
+		if key in self.entries:
+			self.hits += 1
+			return self._touch(key)
+
+		self.misses += 1
+		value = func(*args)
+		self._store(key, value)
+
+		return value
+
+	def _touch(self, key):
+		# Move the entry to the most recently used end
+		value = self.entries.pop(key)
+		self.entries[key] = value
+		return value
+
+	def _store(self, key, value):
+		self.entries[key] = value
+		while len(self.entries) > self.max_size:
+			self.entries.popitem(last=False)
+
+
+def canonical_form(P):
+	"""
+	Canonical form of a polygon: coordinates rounded, exterior ccw and holes
+	cw, every ring starting at its lowest vertex and holes sorted.
+
+	Args:
+		P: polygon in the standard form
+
+	Returns:
+		canonical: polygon in the standard form made of tuples, hashable
+	"""
+
+	ext = _canonical_ring(P[0], True)
+	holes = tuple(sorted(_canonical_ring(hole, False) for hole in P[1]))
+
+	return (ext, holes)
+
+
+def _canonical_ring(ring, ccw):
+	ring = [(round(x, DECIMALS)+0.0, round(y, DECIMALS)+0.0) for x, y in ring]
+
+	if len(ring) > 1 and ring[0] == ring[-1]:
+		ring = ring[:-1]
+
+	# Shoelace sign gives the orientation
+	area = 0.0
+	for i in range(len(ring)):
+		x0, y0 = ring[i-1]
+		x1, y1 = ring[i]
+		area += x0*y1-x1*y0
+
+	if (area > 0) != ccw:
+		ring = ring[::-1]
+
+	if not ring:
+		return tuple(ring)
+
+	start = ring.index(min(ring))
+	return tuple(ring[start:]+ring[:start])
+
+
+# Cache shared by the decomposition and discritization modules
+CACHE = AltitudeCache()
+
+
+def get_min_altitude(P):
+	"""
+	Cached minimum altitude of P and its direction, see
+	altitude.get_min_altitude
+	"""
+
+	return CACHE.get_min_altitude(P)
+
+
+def get_min_altitude_batch(D):
+	"""
+	Cached minimum altitudes and directions of a set of polygons, see
+	altitude.get_min_altitude_batch
+	"""
+
+	return CACHE.get_min_altitude_batch(D)
+
+
+def get_altitude(P, theta):
+	"""
+	Cached theta altitude of P, see altitude.get_altitude
+	"""
+
+	return CACHE.get_altitude(P, theta)
+
+
+def get_stats():
+	"""
+	Hits, misses and hit rate of the shared cache
+	"""
+
+	return CACHE.hits, CACHE.misses, CACHE.hit_rate()
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+		import altitude
+else:
+	from . import altitude
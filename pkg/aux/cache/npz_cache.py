@@ -0,0 +1,99 @@
+import os
+import numpy as np
+
+
+# Default size bound of a cache directory
+DEFAULT_MAX_BYTES = 2**30
+
+
+class NpzCache:
+	"""
+	Size bounded on-disk cache of named NumPy arrays.
+
+	Every entry is one .npz file named after its key. Reading an entry
+	refreshes its modification time, and once the directory grows beyond
+	max_bytes the least recently used entries are evicted.
+	"""
+
+	def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+		"""
+		:param directory: Folder holding the cache entries
+		:param max_bytes: Upper bound on the total size of the entries
+		"""
+
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+
+	def path(self, key):
+		return os.path.join(self.directory, key+'.npz')
+
+	def get(self, key):
+		"""
+		Look up an entry
+
+		:param key: Hex digest identifying the entry
+		:return arrays: Dictionary of arrays, None on a miss
+		"""
+
+		path = self.path(key)
+		if not os.path.exists(path):
+			self.misses += 1
+			return None
+
+		with np.load(path) as data:
+			arrays = dict((name, data[name]) for name in data.files)
+
+		os.utime(path, None)
+		self.hits += 1
+		return arrays
+
+	def put(self, key, **arrays):
+		"""
+		Store an entry and evict old ones if the cache is over its bound
+
+		:param key: Hex digest identifying the entry
+		:param arrays: Named arrays to store
+		"""
+
+		# The directory is only created once there is something to store
+		if not os.path.isdir(self.directory):
+			os.makedirs(self.directory)
+
+		path = self.path(key)
+		tmp_path = path+'.%d.tmp'%os.getpid()
+
+		with open(tmp_path, 'wb') as f:
+			np.savez(f, **arrays)
+		os.rename(tmp_path, path)
+
+		self.evict()
+
+	def evict(self):
+		"""
+		Remove least recently used entries until the cache fits its bound
+		"""
+
+		entries = []
+		for name in os.listdir(self.directory):
+			if not name.endswith('.npz'):
+				continue
+
+			path = os.path.join(self.directory, name)
+			stat = os.stat(path)
+			entries.append((stat.st_mtime, stat.st_size, path))
+
+		total = sum(entry[1] for entry in entries)
+		for mtime, size, path in sorted(entries):
+			if total <= self.max_bytes:
+				break
+
+			os.remove(path)
+			total -= size
+
+	def hit_rate(self):
+		lookups = self.hits + self.misses
+		if not lookups:
+			return 0.0
+		return float(self.hits)/lookups
@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class Chain:
+	"""
+	Polygonal chain indexed by arc length.
+
+	The cumulative length at every vertex is computed once, so locating a
+	distance along the chain is a binary search instead of measuring every
+	prefix of the chain again. Projecting a point is still a linear scan.
+	"""
+
+	def __init__(self, coords):
+		"""
+		:param coords: List of (x, y) tuples, or anything with .coords
+		"""
+
+		if hasattr(coords, 'coords'):
+			coords = coords.coords
+		self.coords = [tuple(p) for p in coords]
+
+		points = np.asarray(self.coords, dtype=float).reshape(-1, 2)
+		deltas = np.diff(points, axis=0)
+
+		self.points = points
+		self.lengths = np.concatenate(([0.0], np.cumsum(np.sqrt((deltas**2).sum(axis=1)))))
+		self.length = float(self.lengths[-1])
+
+	def __len__(self):
+		return len(self.coords)
+
+	def locate(self, distance):
+		"""
+		Find where a distance falls on the chain
+
+		:param distance: Distance from the start
+		:return i: Index of the first vertex at or beyond distance
+		:return exact: True if distance falls on vertex i
+		"""
+
+		i = int(np.searchsorted(self.lengths, distance))
+		i = min(i, len(self.coords)-1)
+		return i, self.lengths[i] == distance
+
+	def interpolate(self, distance):
+		"""
+		Point at a distance from the start, clamped to the chain
+
+		:param distance: Distance from the start
+		:return point: (x, y) tuple
+		"""
+
+		distance = min(max(distance, 0.0), self.length)
+
+		i, exact = self.locate(distance)
+		if exact or i == 0:
+			return self.coords[i]
+
+		segment = self.lengths[i]-self.lengths[i-1]
+		t = (distance-self.lengths[i-1])/segment
+		x, y = self.points[i-1] + t*(self.points[i]-self.points[i-1])
+
+		return (float(x), float(y))
+
+	def project(self, point):
+		"""
+		Distance along the chain to the point of the chain nearest to point.
+		Ties go to the earliest one.
+
+		Unlike locate, this stays linear in the number of segments, as the
+		nearest segment is not ordered by arc length. All segments are
+		measured in one vectorized pass.
+
+		:param point: (x, y) tuple
+		:return distance: Distance from the start
+		"""
+
+		if len(self.coords) < 2:
+			return 0.0
+
+		p = np.asarray(point, dtype=float)
+		a = self.points[:-1]; ab = self.points[1:]-a
+
+		norms = (ab**2).sum(axis=1)
+		t = np.where(norms > 0, ((p-a)*ab).sum(axis=1)/np.where(norms > 0, norms, 1), 0)
+		t = np.clip(t, 0.0, 1.0)
+
+		distances = ((a + t[:, np.newaxis]*ab - p)**2).sum(axis=1)
+		i = int(np.argmin(distances))
+
+		return float(self.lengths[i] + t[i]*np.sqrt(norms[i]))
+
+	def cut(self, distance):
+		"""
+		Cut the chain in two at a distance from its start. A cut at a vertex
+		keeps that vertex in both parts.
+
+		:param distance: Distance from the start, strictly inside the chain
+		:return left: Coordinates from the start up to the cut point
+		:return right: Coordinates from the cut point to the end
+		"""
+
+		i, exact = self.locate(distance)
+		if exact:
+			return self.coords[:i+1], self.coords[i:]
+
+		cp = self.interpolate(distance)
+		return self.coords[:i]+[cp], [cp]+self.coords[i:]
+
+	def split(self, start, stop):
+		"""
+		Cut the chain at two distances at once
+
+		:param start: Distance of the first cut
+		:param stop: Distance of the second cut, not below start
+		:return head: Coordinates up to start
+		:return middle: Coordinates from start to stop
+		:return tail: Coordinates from stop to the end
+		"""
+
+		i, exact_i = self.locate(start)
+		j, exact_j = self.locate(stop)
+
+		start_point = self.interpolate(start)
+		stop_point = self.interpolate(stop)
+
+		# Vertices strictly between the two cut points
+		first = i+1 if exact_i else i
+		head = self.coords[:i]+[start_point]
+		middle = [start_point]+self.coords[first:j]+[stop_point]
+		tail = [stop_point]+self.coords[j+1 if exact_j else j:]
+
+		return head, middle, tail
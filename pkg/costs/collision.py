@@ -0,0 +1,199 @@
+import numbers
+import numpy as np
+from shapely.geometry import box
+from shapely.geometry import LinearRing
+from shapely.geometry import LineString
+from shapely.geometry import MultiLineString
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+
+# Number of (segment, edge) tests evaluated at once
+BLOCK_SIZE = 2**20
+
+# Orientation values closer to zero than this are re-checked exactly
+EPSILON = 1e-9
+
+
+class CollisionIndex:
+	"""
+	Collision index of the boundary of a polygon.
+
+	The boundary rings are built once: a prepared geometry answers exact
+	queries and an STRtree of boundary edges narrows down which edges a
+	batch of transition segments has to be tested against.
+	"""
+
+	def __init__(self, P):
+		"""
+		:param P: Polygon in the standard form
+		"""
+
+		self.P = P
+
+		rings = [LinearRing(P[0])]
+		for hole in P[1]:
+			rings.append(LinearRing(hole))
+
+		edges = []
+		for ring in rings:
+			coords = ring.coords[:]
+			for i in range(len(coords)-1):
+				edges.append((coords[i], coords[i+1]))
+
+		self.edges = np.array(edges, dtype=float).reshape(-1, 2, 2)
+		self.boundary = prep(MultiLineString([ring.coords[:] for ring in rings]))
+
+		self.edge_lines = [LineString(edge) for edge in edges]
+		self.edge_ids = dict((id(line), i) for i, line in enumerate(self.edge_lines))
+		self.tree = STRtree(self.edge_lines)
+
+	def __getstate__(self):
+		# Prepared geometries do not pickle, rebuild them from the polygon
+		return {'P': self.P}
+
+	def __setstate__(self, state):
+		self.__init__(state['P'])
+
+	def has_collision(self, edge):
+		"""
+		Check a single transition segment against the boundary
+
+		:param edge: A pair of (x, y) points
+		:return: True if the segment touches or crosses the boundary
+		"""
+
+		return self.boundary.intersects(LineString(edge))
+
+	def query(self, starts, ends):
+		"""
+		Check every transition segment from starts to ends at once.
+
+		:param starts: (N, 2) array of segment starting points
+		:param ends: (M, 2) array of segment end points
+		:return collisions: (N, M) boolean matrix, True where the segment
+			from starts[i] to ends[j] touches or crosses the boundary
+		"""
+
+		starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+		num_starts = len(starts); num_ends = len(ends)
+
+		collisions = np.zeros((num_starts, num_ends), dtype=bool)
+		if not num_starts or not num_ends or not len(self.edges):
+			return collisions
+
+		# Tiles of contiguous starts and ends cover a small area, so only
+		# the boundary edges inside their envelope have to be tested
+		tile = max(1, int(np.sqrt(BLOCK_SIZE//len(self.edges))))
+		for i0 in range(0, num_starts, tile):
+			i1 = min(i0+tile, num_starts)
+			for j0 in range(0, num_ends, tile):
+				j1 = min(j0+tile, num_ends)
+
+				pts = np.vstack((starts[i0:i1], ends[j0:j1]))
+				minx, miny = pts.min(axis=0)
+				maxx, maxy = pts.max(axis=0)
+				candidates = self._candidate_edges((minx, miny, maxx, maxy))
+				if not len(candidates):
+					continue
+
+				collisions[i0:i1, j0:j1] = self._test_block(
+					starts[i0:i1, np.newaxis, :], ends[np.newaxis, j0:j1, :],
+					self.edges[candidates])
+
+		return collisions
+
+	def query_pairs(self, starts, ends):
+		"""
+		Check transition segments given as aligned pairs of points.
+
+		:param starts: (K, 2) array of segment starting points
+		:param ends: (K, 2) array of segment end points
+		:return collisions: (K,) boolean array, True where the segment from
+			starts[k] to ends[k] touches or crosses the boundary
+		"""
+
+		starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+		num_pairs = len(starts)
+
+		collisions = np.zeros(num_pairs, dtype=bool)
+		if not num_pairs or not len(self.edges):
+			return collisions
+
+		block = max(1, BLOCK_SIZE//len(self.edges))
+		for k0 in range(0, num_pairs, block):
+			k1 = min(k0+block, num_pairs)
+
+			pts = np.vstack((starts[k0:k1], ends[k0:k1]))
+			minx, miny = pts.min(axis=0)
+			maxx, maxy = pts.max(axis=0)
+			candidates = self._candidate_edges((minx, miny, maxx, maxy))
+			if not len(candidates):
+				continue
+
+			collisions[k0:k1] = self._test_block(
+				starts[k0:k1], ends[k0:k1], self.edges[candidates])
+
+		return collisions
+
+	def _candidate_edges(self, bounds):
+		"""
+		Indices of boundary edges whose envelope meets the given bounds
+		"""
+
+		hits = self.tree.query(box(*bounds))
+
+		idx = []
+		for hit in hits:
+			if isinstance(hit, numbers.Integral):
+				idx.append(int(hit))
+			else:
+				idx.append(self.edge_ids[id(hit)])
+		return np.array(sorted(idx), dtype=int)
+
+	def _test_block(self, starts, ends, edges):
+		"""
+		Segment-segment intersection test of broadcastable arrays of segment
+		end points against a set of edges. Nearly degenerate configurations
+		are resolved with the prepared boundary so the result matches the
+		exact geometric predicate.
+		"""
+
+		starts, ends = np.broadcast_arrays(starts, ends)
+
+		a = starts[..., np.newaxis, :]
+		b = ends[..., np.newaxis, :]
+		c = edges[:, 0, :]
+		d = edges[:, 1, :]
+
+		o1 = _orientation(a, b, c)
+		o2 = _orientation(a, b, d)
+		o3 = _orientation(c, d, a)
+		o4 = _orientation(c, d, b)
+
+		overlap = (np.minimum(a[..., 0], b[..., 0]) <= np.maximum(c[..., 0], d[..., 0])) & \
+			(np.minimum(c[..., 0], d[..., 0]) <= np.maximum(a[..., 0], b[..., 0])) & \
+			(np.minimum(a[..., 1], b[..., 1]) <= np.maximum(c[..., 1], d[..., 1])) & \
+			(np.minimum(c[..., 1], d[..., 1]) <= np.maximum(a[..., 1], b[..., 1]))
+
+		hits = overlap & (o1*o2 <= 0) & (o3*o4 <= 0)
+		unsure = overlap & ((np.abs(o1) < EPSILON) | (np.abs(o2) < EPSILON) |
+			(np.abs(o3) < EPSILON) | (np.abs(o4) < EPSILON))
+
+		collisions = hits.any(axis=-1)
+		unsure = unsure.any(axis=-1)
+		for idx in zip(*np.nonzero(unsure)):
+			collisions[idx] = self.has_collision([starts[idx], ends[idx]])
+
+		return collisions
+
+
+def _orientation(p, q, r):
+	"""
+	Signed area of the triangle pqr, broadcast over leading dimensions
+	"""
+
+	return (q[..., 0]-p[..., 0])*(r[..., 1]-p[..., 1]) - \
+		(q[..., 1]-p[..., 1])*(r[..., 0]-p[..., 0])
@@ -0,0 +1,126 @@
+import hashlib
+import numpy as np
+
+
+def instance_key(P, mapping, radius, mode):
+	"""
+	Content hash of everything a cost matrix depends on.
+
+	:param P: Polygon in the standard form
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:param radius: Turning radius
+	:param mode: Description of how the costs are computed
+	:return key: Hex digest
+	"""
+
+	h = hashlib.sha1()
+	h.update(repr((mode, float(radius), len(P[1]))).encode('utf-8'))
+
+	for ring in [P[0]]+list(P[1]):
+		ring = np.asarray(ring, dtype=float)
+		h.update(repr(ring.shape).encode('utf-8'))
+		h.update(ring.tobytes())
+
+	exits, entrances = dubins_batch.get_poses(mapping)
+	cluster_sizes = [len(cluster) for cluster in dubins_cost.get_cluster_list(mapping)]
+
+	h.update(exits.tobytes())
+	h.update(entrances.tobytes())
+	h.update(np.asarray(cluster_sizes, dtype=np.int64).tobytes())
+
+	return h.hexdigest()
+
+
+def compute_costs(cache, P, mapping, radius, mode='dense', k=None, workers=1):
+	"""
+	Cost matrix lookup backed by an on-disk cache.
+
+	The cache is checked first and the costs are only computed, and then
+	stored, on a miss.
+
+	:param cache: NpzCache instance
+	:param P: Polygon in the standard form
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:param radius: Turning radius
+	:param mode: 'dense' or 'geodesic' for compute_costs, 'sparse' for
+		compute_sparse_costs
+	:param k: Number of nearest clusters in sparse mode
+	:param workers: Number of processes in dense and geodesic mode
+	:return cost: Cost matrix
+	:return cluster_list: List of node ids per cluster
+	"""
+
+	if mode == 'sparse' and k is None:
+		k = sparse_cost.NUM_NEIGHBOURS
+
+	key = instance_key(P, mapping, radius, (mode, k))
+	data = cache.get(key)
+
+	if data is not None:
+		cluster_list = dubins_cost.get_cluster_list(mapping)
+
+		if mode == 'sparse':
+			cost = sparse_cost.SparseCostMatrix(len(mapping),
+				data['indptr'], data['indices'], data['data'])
+		else:
+			cost = cost_matrix.CostMatrix(data['cost'], symmetric=False)
+		return cost, cluster_list
+
+	if mode == 'sparse':
+		cost, cluster_list = sparse_cost.compute_sparse_costs(P, mapping, radius, k)
+		cache.put(key, indptr=cost.indptr, indices=cost.indices, data=cost.data)
+	else:
+		cost, cluster_list = dubins_cost.compute_costs(P, mapping, radius, workers,
+			geodesic=(mode == 'geodesic'))
+		cache.put(key, cost=cost.view())
+
+	return cost, cluster_list
+
+
+
+def update_costs(cache, P, old_mapping, mapping, old_cost, radius, mode='dense'):
+	"""
+	Cost matrix lookup backed by an on-disk cache, filled on a miss by
+	updating the matrix of a previous mapping instead of computing it anew.
+
+	The result equals compute_costs in the same mode, so both share their
+	cache entries.
+
+	:param cache: NpzCache instance
+	:param P: Polygon in the standard form
+	:param old_mapping: Mapping old_cost was computed for
+	:param mapping: Mapping to compute the costs for
+	:param old_cost: Cost matrix of old_mapping
+	:param radius: Turning radius
+	:param mode: 'dense' or 'geodesic', the mode old_cost was computed in
+	:return cost: Cost matrix
+	:return cluster_list: List of node ids per cluster
+	"""
+
+	key = instance_key(P, mapping, radius, (mode, None))
+	data = cache.get(key)
+
+	if data is not None:
+		cluster_list = dubins_cost.get_cluster_list(mapping)
+		return cost_matrix.CostMatrix(data['cost'], symmetric=False), cluster_list
+
+	cost, cluster_list = dubins_cost.update_costs(P, old_mapping, mapping, old_cost, radius,
+		geodesic=(mode == 'geodesic'))
+	cache.put(key, cost=cost.view())
+
+	return cost, cluster_list
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import dubins_batch
+		import dubins_cost
+		import sparse_cost
+		import cost_matrix
+else:
+	from . import dubins_batch
+	from . import dubins_cost
+	from . import sparse_cost
+	from . import cost_matrix
@@ -0,0 +1,125 @@
+import numpy as np
+
+
+class CostMatrix:
+	"""
+	Square matrix of integer transition costs.
+
+	Costs are kept in one contiguous int32 ndarray, or for large instances
+	in a file backed np.memmap. Indexing behaves like the underlying array,
+	so cost[i][j], cost[i, j] and row slices work as they do on a list of
+	lists, without boxing a Python int per entry.
+
+	The stage computing the costs may record whether they are symmetric, so
+	the solver instance writer does not have to compare every pair again.
+	"""
+
+	dtype = np.int32
+
+	def __init__(self, data, symmetric=None):
+		"""
+		:param data: (N, N) int32 ndarray or np.memmap holding the costs
+		:param symmetric: Whether the costs are symmetric, None if unknown
+		"""
+
+		self.data = data
+		self.symmetric = symmetric
+
+	@classmethod
+	def empty(cls, num_nodes, filename=None, symmetric=None):
+		"""
+		Allocate an uninitialized matrix
+
+		:param num_nodes: Number of nodes
+		:param filename: Backing file, kept in memory if None
+		:param symmetric: Whether the costs will be symmetric, None if unknown
+		:return: CostMatrix
+		"""
+
+		shape = (num_nodes, num_nodes)
+		if filename is None:
+			return cls(np.empty(shape, dtype=cls.dtype), symmetric)
+
+		return cls(np.memmap(filename, dtype=cls.dtype, mode='w+', shape=shape), symmetric)
+
+	@classmethod
+	def from_array(cls, array, filename=None):
+		"""
+		Convert a matrix of costs, truncating them towards zero the same way
+		the solver instance writer does
+
+		:param array: (N, N) array like of costs
+		:param filename: Backing file, kept in memory if None
+		:return: CostMatrix
+		"""
+
+		array = np.asarray(array)
+
+		matrix = cls.empty(len(array), filename)
+		matrix.data[:] = array
+		return matrix
+
+	@classmethod
+	def open(cls, filename, num_nodes, mode='r'):
+		"""
+		Map a matrix previously written to a file
+
+		:param filename: Backing file
+		:param num_nodes: Number of nodes
+		:param mode: np.memmap access mode
+		:return: CostMatrix
+		"""
+
+		shape = (num_nodes, num_nodes)
+		return cls(np.memmap(filename, dtype=cls.dtype, mode=mode, shape=shape))
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, key):
+		return self.data[key]
+
+	def __setitem__(self, key, value):
+		self.data[key] = value
+
+	def __array__(self, dtype=None, copy=None):
+		if dtype is None:
+			return self.data
+		return self.data.astype(dtype)
+
+	@property
+	def shape(self):
+		return self.data.shape
+
+	@property
+	def filename(self):
+		return getattr(self.data, 'filename', None)
+
+	def rows(self, start, stop):
+		"""
+		Zero-copy view of rows [start, stop)
+		"""
+
+		return self.data[start:stop]
+
+	def cols(self, start, stop):
+		"""
+		Zero-copy view of columns [start, stop)
+		"""
+
+		return self.data[:, start:stop]
+
+	def view(self):
+		"""
+		Zero-copy ndarray view of the whole matrix
+		"""
+
+		return self.data.view(np.ndarray)
+
+	def flush(self):
+		"""
+		Write a file backed matrix out to disk
+		"""
+
+		if isinstance(self.data, np.memmap):
+			self.data.flush()
@@ -0,0 +1,132 @@
+import numpy as np
+
+
+TWO_PI = 2*np.pi
+
+
+def mod2pi(theta):
+	"""
+	Wrap angles into [0, 2pi) the same way the dubins library does
+	"""
+
+	return theta - TWO_PI*np.floor(theta/TWO_PI)
+
+
+def get_poses(mapping):
+	"""
+	Collect exit and entrance poses of every node in the mapping.
+
+	:param mapping: Dictionary from node id to a (segment, direction) tuple,
+		or a SegmentArray
+	:return exits: (N, 3) array of (x, y, heading) exit poses
+	:return entrances: (N, 3) array of (x, y, heading) entrance poses
+	"""
+
+	if hasattr(mapping, 'exit_poses'):
+		return mapping.exit_poses(), mapping.entrance_poses()
+
+	num_nodes = len(mapping)
+
+	exits = np.empty((num_nodes, 3))
+	entrances = np.empty((num_nodes, 3))
+	for i in range(num_nodes):
+		segment, direction_id = mapping[i]
+
+		exits[i] = segment.get_exit_info(direction_id)
+		entrances[i] = segment.get_entrance_info(direction_id)
+
+	return exits, entrances
+
+
+def path_lengths(q0, q1, rho):
+	"""
+	Shortest dubins path lengths between two sets of poses.
+
+	All six word families (LSL, LSR, RSL, RSR, RLR, LRL) are evaluated for
+	every pair at once and the shortest feasible one is kept, mirroring
+	dubins.path_length element by element.
+
+	Args:
+		q0: array (..., 3) of starting poses
+		q1: array (..., 3) of final poses, broadcastable against q0
+		rho: turning radius
+
+	Returns:
+		lengths: array of shortest path lengths with the broadcast shape
+	"""
+
+	q0 = np.asarray(q0, dtype=float)
+	q1 = np.asarray(q1, dtype=float)
+
+	dx = q1[..., 0] - q0[..., 0]
+	dy = q1[..., 1] - q0[..., 1]
+	d = np.sqrt(dx*dx + dy*dy)/rho
+
+	theta = mod2pi(np.arctan2(dy, dx))
+	alpha = mod2pi(q0[..., 2] - theta)
+	beta = mod2pi(q1[..., 2] - theta)
+
+	sa = np.sin(alpha); sb = np.sin(beta)
+	ca = np.cos(alpha); cb = np.cos(beta)
+	c_ab = np.cos(alpha - beta)
+	d_sq = d*d
+
+	best = np.full(d.shape, np.inf)
+
+	with np.errstate(invalid='ignore'):
+		# LSL
+		p_sq = 2 + d_sq - 2*c_ab + 2*d*(sa - sb)
+		tmp = np.arctan2(cb - ca, d + sa - sb)
+		t = mod2pi(tmp - alpha)
+		p = np.sqrt(p_sq)
+		q = mod2pi(beta - tmp)
+		best = _keep_shorter(best, t, p, q, p_sq >= 0)
+
+		# LSR
+		p_sq = -2 + d_sq + 2*c_ab + 2*d*(sa + sb)
+		p = np.sqrt(p_sq)
+		tmp = np.arctan2(-ca - cb, d + sa + sb) - np.arctan2(-2.0, p)
+		t = mod2pi(tmp - alpha)
+		q = mod2pi(tmp - mod2pi(beta))
+		best = _keep_shorter(best, t, p, q, p_sq >= 0)
+
+		# RSL
+		p_sq = -2 + d_sq + 2*c_ab - 2*d*(sa + sb)
+		p = np.sqrt(p_sq)
+		tmp = np.arctan2(ca + cb, d - sa - sb) - np.arctan2(2.0, p)
+		t = mod2pi(alpha - tmp)
+		q = mod2pi(beta - tmp)
+		best = _keep_shorter(best, t, p, q, p_sq >= 0)
+
+		# RSR
+		p_sq = 2 + d_sq - 2*c_ab + 2*d*(sb - sa)
+		tmp = np.arctan2(ca - cb, d - sa + sb)
+		t = mod2pi(alpha - tmp)
+		p = np.sqrt(p_sq)
+		q = mod2pi(tmp - beta)
+		best = _keep_shorter(best, t, p, q, p_sq >= 0)
+
+		# RLR
+		tmp = (6. - d_sq + 2*c_ab + 2*d*(sa - sb))/8.
+		p = mod2pi(TWO_PI - np.arccos(tmp))
+		t = mod2pi(alpha - np.arctan2(ca - cb, d - sa + sb) + mod2pi(p/2.))
+		q = mod2pi(alpha - beta - t + mod2pi(p))
+		best = _keep_shorter(best, t, p, q, np.abs(tmp) <= 1)
+
+		# LRL
+		tmp = (6. - d_sq + 2*c_ab + 2*d*(sb - sa))/8.
+		p = mod2pi(TWO_PI - np.arccos(tmp))
+		t = mod2pi(-alpha - np.arctan2(ca - cb, d + sa - sb) + p/2.)
+		q = mod2pi((mod2pi(beta) - alpha) - t + mod2pi(p))
+		best = _keep_shorter(best, t, p, q, np.abs(tmp) <= 1)
+
+	return best*rho
+
+
+def _keep_shorter(best, t, p, q, valid):
+	"""
+	Replace entries of best where a valid word gives a strictly shorter path
+	"""
+
+	length = t + p + q
+	return np.where(valid & (length < best), length, best)
@@ -1,18 +1,31 @@
-import dubins
-from math import sqrt
+import numpy as np
 from shapely.geometry import LineString
 from shapely.geometry import Polygon
 from shapely.geometry import LinearRing
 
 
-
-def compute_costs(P, mapping, radius):
+def compute_costs(P, mapping, radius, workers=1, geodesic=False, filename=None):
 	"""
 	Compute dubins costs between path segments which could be either
 	a line or a point.
 
-	TODO: Collision checking!!
-
+	Exit and entrance poses are collected once and the dubins lengths are
+	evaluated for a whole block of rows at a time. Collisions are answered
+	for each block by a single collision index query. Blocks may be spread
+	across a pool of processes, the result is identical to the serial path.
+
+	Transitions crossing the boundary get a flat penalty, or with geodesic
+	set, the length of the shortest path around the obstacles when that is
+	longer than the dubins path.
+
+	:param P: Polygon in the standard form
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:param radius: Turning radius
+	:param workers: Number of processes, None to use every core
+	:param geodesic: Cost obstructed transitions by geodesic distance
+	:param filename: File backing the matrix, kept in memory if None
+	:return cost: CostMatrix of costs scaled by 100
+	:return cluster_list: List of node ids per cluster
 	"""
 
 
@@ -20,80 +33,87 @@ def compute_costs(P, mapping, radius):
 	num_nodes = len(mapping)
 
 	r = radius
-	cost = [[0 for i in range(num_nodes)] for i in range(num_nodes)]
 	print("Size: %d nodes."%num_nodes)
 
-	# Populate the cost matrix
-	for i in range(num_nodes):
-#		print(i)
-		for j in range(num_nodes):
+	exits, entrances = dubins_batch.get_poses(mapping)
 
-			q0 = mapping[i][0].get_exit_info(mapping[i][1])
-			q1 = mapping[j][0].get_entrance_info(mapping[j][1])
+	# The boundary is indexed once per polygon
+	index = collision.CollisionIndex(P)
 
-			# Check for collisions
-			x0 = q0[0]; y0 = q0[1]
-			x1 = q1[0]; y1 = q1[1]
+	# Distances from exits to the polygon vertices and from the vertices to
+	# entrances are all that obstructed transitions need later on
+	detours = None
+	if geodesic:
+		geodesic_index = geodesic_cost.GeodesicIndex(P, index)
+		detours = (geodesic_index.vertex_distances(exits[:, :2]),
+			geodesic_index.visible_distances(entrances[:, :2]))
 
-			if has_collision(P, [(x0, y0), (x1, y1)]):
-				length = 9999999
-			else:
-				length = 100*dubins.path_length(q0, q1, r)
+	# Populate the cost matrix, dubins paths depend on the direction of
+	# travel so the costs are always written out as asymmetric
+	cost = cost_matrix.CostMatrix.empty(num_nodes, filename, symmetric=False)
+	sharding.fill_matrix(_dubins_rows, (num_nodes, num_nodes),
+		(exits, entrances, r, index, detours), workers, cost.data)
 
-			cost[i][j] = length
 
+	cluster_list = get_cluster_list(mapping)
+
+	return cost, cluster_list
+
+
+def get_cluster_list(mapping):
+	"""
+	Generate a cluster information list. Nodes of the same segment form
+	one cluster, a new cluster starts at every direction 0.
+
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:return cluster_list: List of node ids per cluster
+	"""
+
+	if hasattr(mapping, 'cluster_list'):
+		return mapping.cluster_list()
 
-	# Generate a cluster information list
 	cluster_list = []
 	node_list = []
-	counter = 0
 
-	for i in range(num_nodes):
+	for i in range(len(mapping)):
 		segment, direction_id = mapping[i]
 		
 		if direction_id == 0:
 			if node_list:
 				cluster_list.append(node_list)
-				counter += 1
 				node_list = []
 
 
 		node_list.append(i)
 	cluster_list.append(node_list)
 
-	return cost, cluster_list
+	return cluster_list
 
 
-def compute_tsp_costs(P, tsp_mapping, radius):
+def compute_tsp_costs(P, tsp_mapping, radius, workers=1):
 	"""
-	Compute direction free costs"
+	Compute direction free costs
+
+	:param P: Polygon in the standard form
+	:param tsp_mapping: Dictionary from node id to a (segment, direction) tuple
+	:param radius: Turning radius
+	:param workers: Number of processes, None to use every core
+	:return cost: (N, N) ndarray of euclidean costs
+	:return cluster_list: List of singleton clusters
 	"""
 
 	MAX_COST = 999999999
 	num_nodes = len(tsp_mapping)
 
 	r = radius
-	cost = [[0 for i in range(num_nodes)] for i in range(num_nodes)]
 	print("Size: %d nodes."%num_nodes)
 
-	# Populate the cost matrix
-	for i in range(num_nodes):
-		print(i)
-		for j in range(num_nodes):
-
-			q0 = tsp_mapping[i][0].get_exit_info(tsp_mapping[i][1])
-			q1 = tsp_mapping[j][0].get_entrance_info(tsp_mapping[j][1])
+	exits, entrances = dubins_batch.get_poses(tsp_mapping)
+	index = collision.CollisionIndex(P)
 
-			# Check for collisions
-			x0 = q0[0]; y0 = q0[1]
-			x1 = q1[0]; y1 = q1[1]
-
-			if has_collision(P, [(x0, y0), (x1, y1)]):
-				length = 9999999
-			else:
-				length = sqrt((x1-x0)**2+(y1-y2)**2)
-
-			cost[i][j] = length
+	# Populate the cost matrix
+	cost = sharding.fill_matrix(_euclidean_rows, (num_nodes, num_nodes),
+		(exits, entrances, index), workers)
 
 
 	# Generate a cluster information list
@@ -105,6 +125,113 @@ def compute_tsp_costs(P, tsp_mapping, radius):
 	return cost, cluster_list	
 
 
+def update_costs(P, old_mapping, new_mapping, old_cost, radius, geodesic=False):
+	"""
+	Update a cost matrix after the set of segments has changed.
+
+	Nodes are matched between the two mappings by their exit and entrance
+	poses, nodes sharing the same poses are paired up in order. Costs
+	between surviving nodes are copied from the old matrix and only the
+	rows and columns of added nodes are computed, so the work scales with
+	the size of the change.
+
+	:param P: Polygon in the standard form
+	:param old_mapping: Mapping the old cost matrix was computed for
+	:param new_mapping: Mapping of the new set of segments
+	:param old_cost: (N_old, N_old) cost matrix of the old mapping
+	:param radius: Turning radius
+	:param geodesic: Whether the old matrix was computed with geodesic set
+	:return cost: CostMatrix of costs scaled by 100
+	:return cluster_list: List of node ids per cluster
+	"""
+
+	old_cost = np.asarray(old_cost)
+	num_nodes = len(new_mapping)
+
+	old_ids = {}
+	for i, key in enumerate(get_mapping.get_node_keys(old_mapping)):
+		old_ids.setdefault(key, []).append(i)
+	for ids in old_ids.values():
+		ids.reverse()
+
+	match = []
+	for key in get_mapping.get_node_keys(new_mapping):
+		ids = old_ids.get(key)
+		match.append(ids.pop() if ids else -1)
+	match = np.array(match, dtype=int)
+
+	kept = np.nonzero(match >= 0)[0]
+	added = np.nonzero(match < 0)[0]
+	print("Size: %d nodes, %d reused, %d added."%(num_nodes, len(kept), len(added)))
+
+	cost = cost_matrix.CostMatrix.empty(num_nodes, symmetric=False)
+	cost[np.ix_(kept, kept)] = old_cost[np.ix_(match[kept], match[kept])]
+
+	if len(added):
+		exits, entrances = dubins_batch.get_poses(new_mapping)
+		index = collision.CollisionIndex(P)
+
+		row_detours = col_detours = None
+		if geodesic:
+			geodesic_index = geodesic_cost.GeodesicIndex(P, index)
+			from_exits = geodesic_index.vertex_distances(exits[:, :2])
+			to_entrances = geodesic_index.visible_distances(entrances[:, :2])
+			row_detours = (from_exits[added], to_entrances)
+			col_detours = (from_exits, to_entrances[added])
+
+		cost[added, :] = _dubins_block(exits[added], entrances, radius, index, row_detours)
+		cost[:, added] = _dubins_block(exits, entrances[added], radius, index, col_detours)
+
+	cluster_list = get_cluster_list(new_mapping)
+
+	return cost, cluster_list
+
+
+def _dubins_rows(start, stop, exits, entrances, r, index, detours=None):
+	"""
+	Dubins costs of rows [start, stop) of the cost matrix
+	"""
+
+	if detours is not None:
+		detours = (detours[0][start:stop], detours[1])
+
+	return _dubins_block(exits[start:stop], entrances, r, index, detours)
+
+
+def _dubins_block(exits, entrances, r, index, detours=None):
+	"""
+	Dubins costs from every exit pose to every entrance pose
+	"""
+
+	q0 = exits[:, np.newaxis, :]
+	q1 = entrances[np.newaxis, :, :]
+	cost = 100*dubins_batch.path_lengths(q0, q1, r)
+
+	blocked = index.query(exits[:, :2], entrances[:, :2])
+	if detours is None:
+		cost[blocked] = 9999999
+		return cost
+
+	rows, cols = np.nonzero(blocked)
+	lengths = 100*geodesic_cost.pair_lengths(detours[0][rows], detours[1][cols])
+	lengths = np.maximum(lengths, cost[rows, cols])
+	cost[rows, cols] = np.minimum(lengths, 9999999)
+
+	return cost
+
+
+def _euclidean_rows(start, stop, exits, entrances, index):
+	"""
+	Euclidean costs of rows [start, stop) of the cost matrix
+	"""
+
+	delta = entrances[np.newaxis, :, :2] - exits[start:stop, np.newaxis, :2]
+	cost = np.sqrt((delta**2).sum(axis=2))
+
+	cost[index.query(exits[start:stop, :2], entrances[:, :2])] = 9999999
+	return cost
+
+
 def has_collision(P, edge):
 
 	exterior = LinearRing(P[0])
@@ -124,5 +251,17 @@ if __name__ == '__main__':
 		sys.path.insert(0, os.path.abspath("../.."))
 
 		from pkg.discritizers import classes
+		from pkg.discritizers import get_mapping
+		import dubins_batch
+		import collision
+		import sharding
+		import geodesic as geodesic_cost
+		import cost_matrix
 else:
-	from ..discritizers import classes
\ No newline at end of file
+	from ..discritizers import classes
+	from ..discritizers import get_mapping
+	from . import dubins_batch
+	from . import collision
+	from . import sharding
+	from . import geodesic as geodesic_cost
+	from . import cost_matrix
\ No newline at end of file
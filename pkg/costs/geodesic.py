@@ -0,0 +1,124 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from shapely.geometry import LineString
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+
+
+# Relative amount a segment is shortened at its vertex end so that
+# reaching the vertex itself does not count as touching the boundary
+SHRINK = 1e-7
+
+
+class GeodesicIndex:
+	"""
+	Shortest obstacle avoiding distances inside a polygon.
+
+	A visibility graph over the vertices of the exterior and the holes is
+	built once and all-pairs Dijkstra is run on it. Distances between
+	arbitrary points are then looked up through the vertices each point can
+	see, without any further geometry queries per pair.
+	"""
+
+	def __init__(self, P, collision_index=None):
+		"""
+		:param P: Polygon in the standard form
+		:param collision_index: CollisionIndex of P, built if not given
+		"""
+
+		self.P = P
+		if collision_index is None:
+			collision_index = collision.CollisionIndex(P)
+		self.collision_index = collision_index
+
+		vertices = list(P[0])
+		for hole in P[1]:
+			vertices.extend(hole)
+		self.vertices = np.array(vertices, dtype=float).reshape(-1, 2)
+
+		num_vertices = len(self.vertices)
+		polygon = prep(Polygon(*P))
+
+		rows = []; cols = []; weights = []
+		for i in range(num_vertices):
+			for j in range(i+1, num_vertices):
+				u = self.vertices[i]; v = self.vertices[j]
+				if polygon.covers(LineString([u, v])):
+					rows.append(i); cols.append(j)
+					weights.append(np.hypot(*(v-u)))
+
+		graph = csr_matrix((weights, (rows, cols)), shape=(num_vertices, num_vertices))
+		self.distances = dijkstra(graph, directed=False)
+
+	def __getstate__(self):
+		return {'P': self.P}
+
+	def __setstate__(self, state):
+		self.__init__(state['P'])
+
+	def visible_distances(self, points):
+		"""
+		Straight line distance from every point to every vertex it can see.
+
+		:param points: (N, 2) array of points inside the polygon
+		:return distances: (N, V) array, inf where the vertex is not visible
+		"""
+
+		points = np.asarray(points, dtype=float).reshape(-1, 2)
+		num_points = len(points); num_vertices = len(self.vertices)
+
+		starts = np.repeat(points, num_vertices, axis=0)
+		ends = np.tile(self.vertices, (num_points, 1))
+		ends = ends - SHRINK*(ends-starts)
+
+		blocked = self.collision_index.query_pairs(starts, ends)
+		delta = self.vertices[np.newaxis, :, :] - points[:, np.newaxis, :]
+		distances = np.sqrt((delta**2).sum(axis=2))
+		distances[blocked.reshape(num_points, num_vertices)] = np.inf
+
+		return distances
+
+	def vertex_distances(self, points):
+		"""
+		Shortest distance from every point to every vertex.
+
+		:param points: (N, 2) array of points inside the polygon
+		:return distances: (N, V) array, inf where the vertex is unreachable
+		"""
+
+		visible = self.visible_distances(points)
+
+		distances = np.full(visible.shape, np.inf)
+		for u in range(len(self.vertices)):
+			np.minimum(distances, visible[:, u, np.newaxis] + self.distances[u], out=distances)
+
+		return distances
+
+
+def pair_lengths(from_vertices, to_vertices):
+	"""
+	Shortest path lengths for aligned pairs of points routed through vertices.
+
+	:param from_vertices: (K, V) shortest distances from the starting points
+		to every vertex
+	:param to_vertices: (K, V) straight distances from every visible vertex
+		to the end points
+	:return lengths: (K,) array of path lengths, inf where unreachable
+	"""
+
+	lengths = np.full(len(from_vertices), np.inf)
+	for v in range(from_vertices.shape[1]):
+		np.minimum(lengths, from_vertices[:, v] + to_vertices[:, v], out=lengths)
+
+	return lengths
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import collision
+else:
+	from . import collision
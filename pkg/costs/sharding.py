@@ -0,0 +1,117 @@
+import multiprocessing
+import numpy as np
+
+
+# Upper bound on the number of matrix entries computed per block
+BLOCK_SIZE = 2**20
+
+# Upper bound on the number of rows per block, keeps enough blocks for a pool
+MAX_BLOCK_ROWS = 64
+
+
+# Shared memory typecodes of the supported output dtypes
+TYPECODES = {np.dtype(np.float64).str: 'd', np.dtype(np.int32).str: 'i'}
+
+# Worker state, set up once per process by _init_worker
+_worker = {}
+
+
+def row_blocks(num_rows, num_cols):
+	"""
+	Split the rows of a matrix into contiguous blocks.
+
+	The partition depends only on the matrix shape, so the serial and the
+	parallel path evaluate exactly the same blocks.
+
+	:param num_rows: Number of rows
+	:param num_cols: Number of columns
+	:return blocks: List of (start, stop) row ranges
+	"""
+
+	block_rows = max(1, min(MAX_BLOCK_ROWS, BLOCK_SIZE//max(num_cols, 1)))
+
+	blocks = []
+	for start in range(0, num_rows, block_rows):
+		blocks.append((start, min(start+block_rows, num_rows)))
+
+	return blocks
+
+
+def fill_matrix(row_func, shape, args, workers=1, out=None):
+	"""
+	Compute a matrix block by block, optionally on a pool of processes.
+
+	row_func(start, stop, *args) must return rows [start, stop) of the
+	matrix. With more than one worker the blocks are spread across a process
+	pool and every worker writes its rows straight into shared memory, or
+	into the backing file when out is a np.memmap, so no results are pickled
+	back to the parent.
+
+	:param row_func: Module level function computing a block of rows
+	:param shape: (num_rows, num_cols) of the matrix
+	:param args: Extra arguments passed to row_func
+	:param workers: Number of processes, None to use every core
+	:param out: Preallocated array to fill, a new float64 array if None
+	:return matrix: The filled array
+	"""
+
+	num_rows, num_cols = shape
+	blocks = row_blocks(num_rows, num_cols)
+
+	if out is None:
+		out = np.empty(shape)
+
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	workers = min(workers, len(blocks))
+
+	if workers <= 1:
+		for start, stop in blocks:
+			out[start:stop] = row_func(start, stop, *args)
+		return out
+
+	if isinstance(out, np.memmap):
+		out.flush()
+		target = ('file', out.filename, out.dtype.str, shape)
+	else:
+		buf = multiprocessing.RawArray(TYPECODES[out.dtype.str], num_rows*num_cols)
+		target = ('buffer', buf, out.dtype.str, shape)
+
+	pool = multiprocessing.Pool(workers, _init_worker, (target, row_func, args))
+	try:
+		pool.map(_fill_block, blocks, chunksize=1)
+	finally:
+		pool.close()
+		pool.join()
+
+	if not isinstance(out, np.memmap):
+		out[:] = np.frombuffer(buf, dtype=out.dtype).reshape(shape)
+
+	return out
+
+
+def _init_worker(target, row_func, args):
+	"""
+	Attach a worker process to the shared output
+	"""
+
+	kind, source, dtype, shape = target
+	if kind == 'file':
+		_worker['matrix'] = np.memmap(source, dtype=dtype, mode='r+', shape=shape)
+	else:
+		_worker['matrix'] = np.frombuffer(source, dtype=dtype).reshape(shape)
+
+	_worker['row_func'] = row_func
+	_worker['args'] = args
+
+
+def _fill_block(block):
+	"""
+	Compute one block of rows inside a worker process
+	"""
+
+	start, stop = block
+	_worker['matrix'][start:stop] = _worker['row_func'](start, stop, *_worker['args'])
+
+	if isinstance(_worker['matrix'], np.memmap):
+		_worker['matrix'].flush()
@@ -0,0 +1,190 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# Cost of every transition that is not a candidate edge
+PENALTY = 9999999
+
+# Default number of nearest clusters kept per node
+NUM_NEIGHBOURS = 8
+
+
+class SparseCostMatrix:
+	"""
+	Cost matrix holding only candidate edges.
+
+	Candidates are stored row by row in compressed sparse row form, every
+	other entry is implicitly the default penalty. Indexing with a node id
+	returns the dense row, so code written for a list of lists keeps working
+	while only one row is materialized at a time.
+	"""
+
+	def __init__(self, num_nodes, indptr, indices, data, default=PENALTY):
+		"""
+		:param num_nodes: Number of nodes
+		:param indptr: (N+1,) offsets of each row in indices and data
+		:param indices: Column of every candidate edge, sorted within a row
+		:param data: Cost of every candidate edge
+		:param default: Cost of all other entries
+		"""
+
+		self.num_nodes = num_nodes
+		self.indptr = indptr
+		self.indices = indices
+		self.data = data
+		self.default = default
+
+	def __len__(self):
+		return self.num_nodes
+
+	def __getitem__(self, key):
+		if isinstance(key, tuple):
+			i, j = key
+			cols, costs = self.candidates(i)
+			pos = np.searchsorted(cols, j)
+			if pos < len(cols) and cols[pos] == j:
+				return costs[pos]
+			return self.default
+
+		return self.row(key)
+
+	@property
+	def num_candidates(self):
+		return len(self.indices)
+
+	def candidates(self, i):
+		"""
+		Candidate edges leaving node i
+
+		:param i: Node id
+		:return cols: Sorted column ids of the candidates
+		:return costs: Costs of the candidates
+		"""
+
+		start = self.indptr[i]; stop = self.indptr[i+1]
+		return self.indices[start:stop], self.data[start:stop]
+
+	def row(self, i):
+		"""
+		Dense row i with the default penalty outside the candidates
+		"""
+
+		row = np.full(self.num_nodes, self.default, dtype=self.data.dtype)
+		cols, costs = self.candidates(i)
+		row[cols] = costs
+		return row
+
+	def rows(self, start, stop):
+		"""
+		Dense rows [start, stop) with the default penalty outside the candidates
+		"""
+
+		block = np.full((stop-start, self.num_nodes), self.default, dtype=self.data.dtype)
+
+		lo = self.indptr[start]; hi = self.indptr[stop]
+		counts = np.diff(self.indptr[start:stop+1])
+		block[np.repeat(np.arange(stop-start), counts), self.indices[lo:hi]] = self.data[lo:hi]
+		return block
+
+	def edges(self):
+		"""
+		All candidate edges as (rows, cols, costs) arrays
+		"""
+
+		rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+		return rows, self.indices, self.data
+
+
+def compute_sparse_costs(P, mapping, radius, k=NUM_NEIGHBOURS):
+	"""
+	Compute dubins costs only towards the k nearest clusters of each node.
+
+	A KD-tree over the entrance positions finds, for the exit of every node,
+	the closest entrances. The nodes of the first k distinct clusters other
+	than its own become its candidate edges. Transitions colliding with the
+	boundary are dropped, so they fall back to the implicit penalty.
+
+	Only the dubins evaluations and the cached entries shrink. GLKH reads
+	EXPLICIT weights from a full matrix alone, so instance files written
+	from a sparse matrix are as large as dense ones.
+
+	:param P: Polygon in the standard form
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:param radius: Turning radius
+	:param k: Number of nearest clusters kept per node
+	:return cost: SparseCostMatrix with costs scaled by 100
+	:return cluster_list: List of node ids per cluster
+	"""
+
+	num_nodes = len(mapping)
+	print("Size: %d nodes, %d neighbouring clusters."%(num_nodes, k))
+
+	exits, entrances = dubins_batch.get_poses(mapping)
+	cluster_list = dubins_cost.get_cluster_list(mapping)
+	num_clusters = len(cluster_list)
+
+	cluster_start = np.array([cluster[0] for cluster in cluster_list])
+	cluster_size = np.array([len(cluster) for cluster in cluster_list])
+	cluster_of = np.repeat(np.arange(num_clusters), cluster_size)
+
+	# Enough neighbours to see k clusters besides the own one
+	max_size = cluster_size.max()
+	num_query = min(num_nodes, (k+1)*max_size)
+	_, nearest = cKDTree(entrances[:, :2]).query(exits[:, :2], k=num_query)
+	nearest = nearest.reshape(num_nodes, num_query)
+
+	# First occurrence of every cluster within a row, in order of distance
+	rows = np.repeat(np.arange(num_nodes), num_query)
+	pos = np.tile(np.arange(num_query), num_nodes)
+	clusters = cluster_of[nearest.ravel()]
+
+	keep = clusters != cluster_of[rows]
+	rows = rows[keep]; pos = pos[keep]; clusters = clusters[keep]
+
+	order = np.lexsort((pos, clusters, rows))
+	rows = rows[order]; pos = pos[order]; clusters = clusters[order]
+	first = np.ones(len(rows), dtype=bool)
+	first[1:] = (rows[1:] != rows[:-1]) | (clusters[1:] != clusters[:-1])
+	rows = rows[first]; pos = pos[first]; clusters = clusters[first]
+
+	# Rank clusters by distance within each row and keep the k nearest
+	order = np.lexsort((pos, rows))
+	rows = rows[order]; clusters = clusters[order]
+	row_start = np.searchsorted(rows, np.arange(num_nodes))
+	rank = np.arange(len(rows)) - row_start[rows]
+	rows = rows[rank < k]; clusters = clusters[rank < k]
+
+	# Expand every chosen cluster into its nodes
+	sizes = cluster_size[clusters]
+	pair_rows = np.repeat(rows, sizes)
+	offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes)-sizes, sizes)
+	pair_cols = np.repeat(cluster_start[clusters], sizes) + offsets
+
+	# Evaluate the candidates
+	costs = 100*dubins_batch.path_lengths(exits[pair_rows], entrances[pair_cols], radius)
+
+	index = collision.CollisionIndex(P)
+	free = ~index.query_pairs(exits[pair_rows, :2], entrances[pair_cols, :2])
+	pair_rows = pair_rows[free]; pair_cols = pair_cols[free]; costs = costs[free]
+
+	order = np.lexsort((pair_cols, pair_rows))
+	indptr = np.zeros(num_nodes+1, dtype=int)
+	indptr[1:] = np.cumsum(np.bincount(pair_rows, minlength=num_nodes))
+
+	costs = costs[order].astype(np.int32)
+	cost = SparseCostMatrix(num_nodes, indptr, pair_cols[order], costs)
+	return cost, cluster_list
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import dubins_batch
+		import dubins_cost
+		import collision
+else:
+	from . import dubins_batch
+	from . import dubins_cost
+	from . import collision
@@ -394,83 +394,44 @@ def find_cut_space(P, v):
 
 def perform_cut(P, e):
 	"""
-	Split up P into two polygons by cutting along e
+	Split up P into two polygons by cutting along e. The boundary is indexed
+	by arc length once and split at both end points of e in one pass.
 	"""
 
 	v = e[0]
 	w = e[1]
-	chain = LineString(P[0]+[P[0][0]])
+	boundary = chain.Chain(P[0]+[P[0][0]])
 
-	distance_to_v = chain.project(Point(v))
-	distance_to_w = chain.project(Point(w))
+	distance_to_v = boundary.project(v)
+	distance_to_w = boundary.project(w)
 #	print distance_to_v, distance_to_w, e
 	if distance_to_w > distance_to_v:
 		if distance_to_v == 0:
-			distance_to_w = chain.project(Point(w))
-			right_chain, remaining = cut(chain, distance_to_w)
-
-			p_l = remaining.coords[:]
-			p_r = right_chain.coords[:]	
+			p_r, p_l = cut(boundary, distance_to_w)
 		else:
-			cut_v_1, cut_v_2 = cut(chain, distance_to_v)
-
-			distance_to_w = cut_v_2.project(Point(w))
-			right_chain, remaining = cut(cut_v_2, distance_to_w)
-
-			p_l = cut_v_1.coords[:]+remaining.coords[:-1]
-			p_r = right_chain.coords[:]
+			head, p_r, tail = boundary.split(distance_to_v, distance_to_w)
+			p_l = head+tail[:-1]
 
 	else:
 		if distance_to_w == 0:
-			distance_to_v = chain.project(Point(v))
-			right_chain, remaining = cut(chain, distance_to_v)
-
-			p_l = remaining.coords[:]
-			p_r = right_chain.coords[:]		
+			p_r, p_l = cut(boundary, distance_to_v)
 		else:
-#			print "here"
-			cut_v_1, cut_v_2 = cut(chain, distance_to_w)
-			#print("Cut1: %s"%cut_v_1)
-#			print("Cut2: %s"%cut_v_2)
-
-			distance_to_v = cut_v_2.project(Point(v))
-#			print("Dist: %2f. Length: %2f"%(distance_to_v, cut_v_2.length) )
-			right_chain, remaining = cut(cut_v_2, distance_to_v)
-#			print remaining.coords[:]
-			p_l = cut_v_1.coords[:]+remaining.coords[:-1]
-			p_r = right_chain.coords[:]
-#			p_l = right_chain.coords[:] 
-#			p_r = remaining.coords[:]+cut_v_1.coords[:]
-#			print p_l, p_r
+			head, p_r, tail = boundary.split(distance_to_w, distance_to_v)
+			p_l = head+tail[:-1]
 	#print p_r
 	return p_l, p_r
 
 
-def cut(line, distance):
+def cut(boundary, distance):
 	"""
-	Splicing a line
-	Credits go to author of the shapely manual
+	Splicing a chain at a distance along it, located by binary search over
+	the cumulative arc lengths of the chain
 	"""
 	# Cuts a line in two at a distance from its starting point
-	if distance <= 0.0 or distance >= line.length:
-		return [LineString(line)]
-	coords = list(line.coords)
-	for i, p in enumerate(coords):
-		pd = line.project(Point(p))
-		if pd == distance:
-			return [
-				LineString(coords[:i+1]),
-				LineString(coords[i:])]
-		if pd > distance:
-			cp = line.interpolate(distance)
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
-		if i == len(coords)-1:
-			cp = line.interpolate(distance)
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
+	if distance <= 0.0 or distance >= boundary.length:
+		return [boundary.coords[:]]
+
+	return boundary.cut(distance)
 
 
 def combine_chains(P, theta):
@@ -495,9 +456,9 @@ def combine_chains(P, theta):
 	chains[n] = ext
 	# Loop over the whole chain dict except the last case
 	for i in range(len(chains)-1):
-		chain = chains[i]
+		cur_chain = chains[i]
 
-		R = find_reflex_vertices(chain)
+		R = find_reflex_vertices(cur_chain)
 		for v in R:
 			#print("Reflex v: %s"%(v,))
 			hyperplane = LineString([(v[0],maxy), (v[0],miny)])
@@ -542,12 +503,11 @@ def combine_chains(P, theta):
 			cut_parameters = up[1]; break # Maybe need to choose smartly
 
 		#print("Cutting from: %s to %s"%(v, cut_parameters))
-		orig_chain = LineString(chain+[chain[0]])
-		dest_chain = LineString(chains[cut_parameters[1]]+[chains[cut_parameters[1]][0]])
-		#print orig_chain, dest_chain
+		orig_chain = chain.Chain(cur_chain+[cur_chain[0]])
+		dest_chain = chain.Chain(chains[cut_parameters[1]]+[chains[cut_parameters[1]][0]])
 
-		distance_to_v = orig_chain.project(Point(v))
-		distance_to_w = dest_chain.project(Point(cut_parameters[0]))
+		distance_to_v = orig_chain.project(v)
+		distance_to_w = dest_chain.project(cut_parameters[0])
 		#print("Dist_v: %2f, Dist_w: %2f"%(distance_to_v, distance_to_w))
 		#print("Orig_l: %2f, Dist_l: %2f"%(orig_chain.length, dest_chain.length))
 
@@ -559,13 +519,12 @@ def combine_chains(P, theta):
 			dest_chain_1 = []; dest_chain_2 = dest_chain.coords[:]
 		else:
 			dest_chain_1, dest_chain_2 = cut(dest_chain, distance_to_w)
-			#print cut(dest_chain, distance_to_w)
 
 		#if LinearRing(dest_chain).is_ccw:
-		final_chain = dest_chain_1.coords[:]+\
-						orig_chain_2.coords[:-1]+\
-						orig_chain_1.coords[:]+\
-						dest_chain_2.coords[:-1]
+		final_chain = dest_chain_1+\
+						orig_chain_2[:-1]+\
+						orig_chain_1+\
+						dest_chain_2[:-1]
 
 		# Now modify the chains array accoridngly to propagate the fusion method
 		if cut_parameters[1] == (len(chains)-1):
@@ -673,7 +632,12 @@ def find_common_polys(D, v):
 
 	return found_polys[0], found_polys[1]
 
+
 if __name__ == "__main__":
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+		from aux.geometry import chain
 
 #	ext = [(0.0, 0.0),
 #			(4.0, 0.0),
@@ -798,4 +762,6 @@ if __name__ == "__main__":
 	p2 = [(0,0), (1,0), (1,1), (0,1)]
 	e = [(1,0), (1,1)]
 #	print combine_two_adjacent_polys(p1,p2,e)
-#	print find_cut_edge(p1,p2,e[0])
\ No newline at end of file
+#	print find_cut_edge(p1,p2,e[0])
+else:
+	from ...aux.geometry import chain
@@ -500,118 +500,62 @@ def find_best_transition_point(s, cut_origin, dir_l, dir_r):
 
 def perform_cut(P, e):
 	"""
-	Split up P into two polygons by cutting along e
+	Split up P into two polygons by cutting along e. The boundary is indexed
+	by arc length once, both end points of e are projected on it and it is
+	split at both of them in one pass.
 	"""
 
 	#print("Cut edge: %s"%(e,))
 	v = e[0]
 	w = e[1]
-	chain = LineString(P[0]+[P[0][0]])
-	#print("Chain to be cut: %s"%(chain,))
-	#print("Chain length: %7f"%chain.length)
+	boundary = chain.Chain(P[0]+[P[0][0]])
+	#print("Chain length: %7f"%boundary.length)
 
-	distance_to_v = chain.project(Point(v))
-	distance_to_w = chain.project(Point(w))
+	distance_to_v = boundary.project(v)
+	distance_to_w = boundary.project(w)
 	#print("D_to_w: %7f, D_to_v: %2f"%(distance_to_w, distance_to_v))
 
 	if distance_to_w > distance_to_v:
-		if round(distance_to_w, 4) >= round(chain.length, 4):
+		if round(distance_to_w, 4) >= round(boundary.length, 4):
 	#		print("Special case")
-			distance_to_v = chain.project(Point(v))
-			left_chain, right_chain = cut(chain, distance_to_v)
-
-			p_l = left_chain.coords[:]
-			p_r = right_chain.coords[:]		
+			p_l, p_r = cut(boundary, distance_to_v)
 		else:
 			if distance_to_v == 0:
-				distance_to_w = chain.project(Point(w))
-				right_chain, remaining = cut(chain, distance_to_w)
-
-				p_l = remaining.coords[:]
-				p_r = right_chain.coords[:]	
+				p_r, p_l = cut(boundary, distance_to_w)
 			else:
-				cut_v_1, cut_v_2 = cut(chain, distance_to_v)
-
-				distance_to_w = cut_v_2.project(Point(w))
-				right_chain, remaining = cut(cut_v_2, distance_to_w)
-
-				p_l = cut_v_1.coords[:]+remaining.coords[:-1]
-				p_r = right_chain.coords[:]
+				head, p_r, tail = boundary.split(distance_to_v, distance_to_w)
+				p_l = head+tail[:-1]
 
 	else:
-		if round(distance_to_v, 4) >= round(chain.length, 4):
+		if round(distance_to_v, 4) >= round(boundary.length, 4):
 	#		print("Special case")
-			distance_to_w = chain.project(Point(w))
-			right_chain, remaining = cut(chain, distance_to_w)
-
-			p_l = remaining.coords[:]
-			p_r = right_chain.coords[:]			
+			p_r, p_l = cut(boundary, distance_to_w)
 		else:
 			if distance_to_w == 0:
-				distance_to_v = chain.project(Point(v))
-				right_chain, remaining = cut(chain, distance_to_v)
-
-				p_l = remaining.coords[:]
-				p_r = right_chain.coords[:]		
+				p_r, p_l = cut(boundary, distance_to_v)
 			else:
-	#			print "here"
-				#print chain
-				cut_v_1, cut_v_2 = cut(chain, distance_to_w)
-				#print("Cut1: %s"%cut_v_1)
-				#print("Cut2: %s"%cut_v_2)
-
-
-				distance_to_v = cut_v_2.project(Point(v))
-	#			print("Dist: %2f. Length: %2f"%(distance_to_v, cut_v_2.length) )
-				right_chain, remaining = cut(cut_v_2, distance_to_v)
-	#			print remaining.coords[:]
-				p_l = cut_v_1.coords[:]+remaining.coords[:-1]
-				p_r = right_chain.coords[:]
-	#			p_l = right_chain.coords[:] 
-	#			p_r = remaining.coords[:]+cut_v_1.coords[:]
-	#			print p_l, p_r
+				head, p_r, tail = boundary.split(distance_to_w, distance_to_v)
+				p_l = head+tail[:-1]
 
 	return p_l, p_r
 
 
-def cut(line, distance):
+def cut(boundary, distance):
 	"""
-	Splicing a line
-	Credits go to author of the shapely manual
+	Splicing a chain at a distance along it, located by binary search over
+	the cumulative arc lengths of the chain
+	:param boundary: chain.Chain to cut
+	:param distance: distance from the start of the chain
+	:return left, right: lists of coordinates on both sides of the cut
 	"""
 	# Cuts a line in two at a distance from its starting point
-	if distance <= 0.0 or distance >= line.length:
+	if distance <= 0.0 or distance >= boundary.length:
 		print("ERROR: CUT BEYONG LENGTH")
-		print line
+		print boundary.coords
 		print(distance)
-		return [LineString(line), []]
-
-	coords = list(line.coords)
-	#print("Coords: %s"%(coords,))
-	pd = 0
-	#for i, p in enumerate(coords):
-	for i in range(len(coords)):
-		if i > 0:
-			pd = LineString(coords[:i+1]).length
-		#print i,coords[:i+1]
-		#pd = line.project(Point(p))
-		#print pd
-		if pd == distance:
-			return [
-				LineString(coords[:i+1]),
-				LineString(coords[i:])]
-		if pd > distance:
-			#print("This case")
-			cp = line.interpolate(distance)
-			#print("cp: %s"%(cp,))
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
-		if i == len(coords)-1:
-			cp = line.interpolate(distance)
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
+		return [boundary.coords[:], []]
+
+	return boundary.cut(distance)
 
 
 def iterative_project(line, distance):
@@ -625,11 +569,14 @@ if __name__ == '__main__':
 	if __package__ is None:
 		import os, sys
 		sys.path.insert(0, os.path.abspath("../.."))
+		from aux.altitudes import altitude_cache as alt
 		from aux.geometry import rotation
+		from aux.geometry import chain
 		import reflex
 else:
-	from ...aux.altitudes import altitude as alt
+	from ...aux.altitudes import altitude_cache as alt
 	from ...aux.geometry import rotation
+	from ...aux.geometry import chain
 	from ...poly_operations.others import chain_combination
 	from ...poly_operations.others import reflex
 	from ...poly_operations.others import directions
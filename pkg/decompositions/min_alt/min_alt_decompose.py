@@ -275,13 +275,14 @@ if __name__ == '__main__':
 	if __package__ is None:
 		import os, sys
 		sys.path.insert(0, os.path.abspath("../.."))
+		from aux.altitudes import altitude_cache as alt
 		from aux.geometry import rotation
 		import reflex
 else:
-	from ...aux.altitudes import altitude as alt
+	from ...aux.altitudes import altitude_cache as alt
 	from ...decompositions.min_alt import cuts
 	from ...poly_operations.others import chain_combination
 	from ...poly_operations.others import reflex
 	from ...poly_operations.others import operations
-	from ...poly_operations.others import adjacency
+	from ...decompositions import adjacency
 	from ...aux.geometry import edges
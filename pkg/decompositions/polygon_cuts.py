@@ -8,6 +8,14 @@ from shapely.geometry import Point
 from decimal import Decimal
 from decimal import getcontext
 
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath(".."))
+		from aux.geometry import chain
+else:
+	from ..aux.geometry import chain
+
 
 def decomposing_line_cut_by_splicing(P, v, w):
 	"""Decomposing cut splitting a polygon into two.
@@ -38,101 +46,70 @@ def decomposing_line_cut_by_splicing(P, v, w):
 	v_Point = Point(v)
 	w_Point = Point(w)
 
-	chain = LineString(P[0]+[P[0][0]])
+	ring = LineString(P[0]+[P[0][0]])
+	boundary = chain.Chain(ring)
 
-	distance_to_v = chain.project(v_Point)
-	distance_to_w = chain.project(w_Point)
+	distance_to_v = boundary.project(v)
+	distance_to_w = boundary.project(w)
 
-	if not chain.intersects(v_Point):
+	if not ring.intersects(v_Point):
 		print("decomposing_cut_as_line: V not on chain")
-	if not chain.intersects(w_Point):
+	if not ring.intersects(w_Point):
 		print("decomposing_cut_as_line: W not on chain")
 	if distance_to_w == distance_to_v:
 		print("decomposing_cut_as_line: W and V are the same")
 
 
-	if distance_to_w >= chain.length or distance_to_w == 0:
-
-		left_chain, right_chain = cut_linestring(chain, distance_to_v)
+	if distance_to_w >= boundary.length or distance_to_w == 0:
 
-		p_l = left_chain.coords[:]
-		p_r = right_chain.coords[:]		
+		p_l, p_r = cut_linestring(boundary, distance_to_v)
 
 		return p_l, p_r
 
-	if distance_to_v >= chain.length or distance_to_v == 0:
+	if distance_to_v >= boundary.length or distance_to_v == 0:
 
-		left_chain, right_chain = cut_linestring(chain, distance_to_w)
-
-		p_l = right_chain.coords[:]
-		p_r = left_chain.coords[:]		
+		p_r, p_l = cut_linestring(boundary, distance_to_w)
 
 		return p_l, p_r
 
 
 	if distance_to_w > distance_to_v:
 
-		left_v_cut, right_v_cut = cut_linestring(chain, distance_to_v)
-
-		distance_to_w = right_v_cut.project(w_Point)
-		left_w_chain, right_w_chain = cut_linestring(right_v_cut, distance_to_w)
-
-		p_l = left_v_cut.coords[:]+right_w_chain.coords[:-1]
-		p_r = left_w_chain.coords[:]
+		head, p_r, tail = boundary.split(distance_to_v, distance_to_w)
+		p_l = head+tail[:-1]
 
 		return p_l, p_r
 
 	else:
 
-		left_w_cut, right_w_cut = cut_linestring(chain, distance_to_w)
-
-		distance_to_v = right_w_cut.project(v_Point)
-		left_v_chain, right_v_chain = cut_linestring(right_w_cut, distance_to_v)
-
-		p_l = left_w_cut.coords[:]+right_v_chain.coords[:-1]
-		p_r = left_v_chain.coords[:]
+		head, p_r, tail = boundary.split(distance_to_w, distance_to_v)
+		p_l = head+tail[:-1]
 
 		return p_l, p_r
 
 
-def cut_linestring(line, distance):
-	"""Shapely implementation of a cut
+def cut_linestring(boundary, distance):
+	"""Cut of a chain by cumulative arc length
 
-	Splicing a LineString into two separating a distance from start
-	Credits go to author of the shapely manual
+	Splicing a chain into two separating a distance from start. The cut
+	point is located by binary search over the prefix sums of the edge
+	lengths, which the chain computes once.
 
 	Args:
-		line: LineString representation of a line
+		boundary: chain.Chain to cut
 		distance: Scalar representing the distance from start of the line
 
 	Returns:
-		left: Part of line on the left of cut point
-		right: Part of line on the right of cut point
+		left: Coordinates of the line on the left of cut point
+		right: Coordinates of the line on the right of cut point
 	"""
 
-	pd = 0
-
-	distance = distance % line.length
+	distance = distance % boundary.length
 
 	if distance == 0.0:
-		return [line, []]
+		return [boundary.coords[:], []]
 
-
-	coords = list(line.coords)
-	for i in range(1, len(coords)):
-		
-		pd = LineString(coords[:i+1]).length
-
-		if pd == distance:
-			return [
-				LineString(coords[:i+1]),
-				LineString(coords[i:])]
-
-		if pd > distance:
-			cp = line.interpolate(distance)
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
+	return boundary.cut(distance)
 
 
 def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
@@ -166,16 +143,17 @@ def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
 	v_Point = Point(v)
 	w_Point = Point(w)
 
-	chain = LineString(P[0]+[P[0][0]])
+	ring = LineString(P[0]+[P[0][0]])
+	boundary = chain.Chain(ring)
 
-	if not chain.intersects(v_Point):
+	if not ring.intersects(v_Point):
 		print("decomposing_poly_cut_as_line: V not on chain")
-	if not chain.intersects(w_Point):
+	if not ring.intersects(w_Point):
 		print("decomposing_poly_cut_as_line: W not on chain")
 
 
-	distance_to_v = chain.project(v_Point)
-	distance_to_w = chain.project(w_Point)
+	distance_to_v = boundary.project(v)
+	distance_to_w = boundary.project(w)
 
 	if distance_to_w == distance_to_v:
 		print("decomposing_cut_as_line: W and V are the same")
@@ -183,9 +161,9 @@ def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
 
 	# Generate pairs of v and w modified by some epsilon amount 
 	v_l_displacements = [distance_to_v+(i*epsilon) for i in [-1, -2, 0]]
-	v_r_displacements = [(distance_to_v+(i*epsilon))%chain.length for i in [1, 0, 2]]
+	v_r_displacements = [(distance_to_v+(i*epsilon))%boundary.length for i in [1, 0, 2]]
 	w_l_displacements = [distance_to_w+(i*epsilon) for i in [-1, -2, 0]]
-	w_r_displacements = [(distance_to_w+(i*epsilon))%chain.length for i in [1, 0, 2]]
+	w_r_displacements = [(distance_to_w+(i*epsilon))%boundary.length for i in [1, 0, 2]]
 
 	def splice_polygon(dist_v, dist_w):
 		"""Portion of decomposing_line_cut_by_splicing wihtout points
@@ -193,46 +171,37 @@ def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
 		Function for evaluating validity of candidates
 		"""
 
-		if dist_w >= chain.length or dist_w == 0:
-
-			left_chain, right_chain = cut_linestring(chain, dist_v)
+		if dist_w >= boundary.length or dist_w == 0:
 
-			p_l = left_chain.coords[:]
-			p_r = right_chain.coords[:]		
+			p_l, p_r = cut_linestring(boundary, dist_v)
 
 			return p_l, p_r
 
-		if dist_v >= chain.length or dist_v == 0:
+		if dist_v >= boundary.length or dist_v == 0:
 
-			left_chain, right_chain = cut_linestring(chain, dist_w)
-
-			p_l = right_chain.coords[:]
-			p_r = left_chain.coords[:]		
+			p_r, p_l = cut_linestring(boundary, dist_w)
 
 			return p_l, p_r
 
 
-		if dist_w%chain.length > dist_v%chain.length:
+		dist_v = dist_v%boundary.length
+		dist_w = dist_w%boundary.length
 
-			left_v_chain, right_v_chain = cut_linestring(chain, dist_v)
-			left_w_chain, right_w_chain = cut_linestring(chain, dist_w)
+		if dist_w > dist_v:
 
-			common = LineString(left_w_chain).difference(LineString(left_v_chain))
+			head, common, tail = boundary.split(dist_v, dist_w)
 
-			p_l = left_v_chain.coords[:]+right_w_chain.coords[:-1]
-			p_r = common.coords[:]
+			p_l = head+tail[:-1]
+			p_r = common
 
 			return p_l, p_r
 
 		else:
 
-			left_v_chain, right_v_chain = cut_linestring(chain, dist_v)
-			left_w_chain, right_w_chain = cut_linestring(chain, dist_w)
-
-			common = LineString(left_v_chain).difference(LineString(left_w_chain))
+			head, common, tail = boundary.split(dist_w, dist_v)
 
-			p_l = common.coords[:]
-			p_r = left_w_chain.coords[:]+right_v_chain.coords[:-1]
+			p_l = common
+			p_r = head+tail[:-1]
 
 			return p_l, p_r
 
@@ -267,42 +236,37 @@ def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
 		print("splice_polygon: No correct cut combination found!")
 		return
 
-	v_l = chain.interpolate(v_l_displacements[i]).coords[:]
-	v_r = chain.interpolate(v_r_displacements[i]).coords[:]
-	w_l = chain.interpolate(w_l_displacements[j]).coords[:]
-	w_r = chain.interpolate(w_r_displacements[j]).coords[:]
+	v_l = [boundary.interpolate(v_l_displacements[i]%boundary.length)]
+	v_r = [boundary.interpolate(v_r_displacements[i]%boundary.length)]
+	w_l = [boundary.interpolate(w_l_displacements[j]%boundary.length)]
+	w_r = [boundary.interpolate(w_r_displacements[j]%boundary.length)]
 
 	def get_verts(v_l, v_r):
 		"""Function for extraction verts between two points
 		"""
 
-		v_l = v_l%chain.length
-		v_r = v_r%chain.length
+		v_l = v_l%boundary.length
+		v_r = v_r%boundary.length
 
 		points = []
-		coords = list(chain.coords)
+		coords = boundary.coords
+		lengths = boundary.lengths
 		if v_r > v_l:
 
 			for i in range(1, len(coords)):
-			
-				pd = LineString(coords[:i+1]).length
 
-				if pd > v_l and pd < v_r:
+				if lengths[i] > v_l and lengths[i] < v_r:
 					points.append(coords[i])
 		else:
 
 			for i in range(1, len(coords)):
-			
-				pd = LineString(coords[:i+1]).length
 
-				if pd > v_l:
+				if lengths[i] > v_l:
 					points.append(coords[i])
 
 			for i in range(1, len(coords)):
-			
-				pd = LineString(coords[:i+1]).length
 
-				if pd < v_r:
+				if lengths[i] < v_r:
 					points.append(coords[i])
 
 
@@ -357,8 +321,6 @@ def decomposing_poly_cut_by_set_op(P, v, w, epsilon=10e-2):
 #		return p_l, None
 
 
-
-
 ext = [(0.0, 0.0),
 		(4.0,  0.0),
 		(5.0,  1.0),
@@ -1,6 +1,7 @@
 from math import acos
 from math import pi
 from math import sqrt
+import numpy as np
 
 
 class LineSegment:
@@ -59,3 +60,145 @@ class PointSegment:
 
 	def get_length(self):
 		return 0.0
+
+
+class SegmentArray:
+	"""
+	Struct of arrays holding a whole set of segments and their nodes.
+
+	Segments are stored as rows of start and end points with their kind, a
+	point segment has equal start and end. Nodes follow get_mapping: the
+	directions of every segment are numbered consecutively, in the order of
+	the segments. Exit and entrance poses of all nodes come out as arrays
+	without touching a segment object. Indexing by a node id gives the same
+	(segment, direction) tuple as a mapping, the segment object is only
+	built on first access.
+	"""
+
+	# Kinds of segments
+	LINE = 0
+	POINT = 1
+
+	# Number of directions of each kind
+	DIRS_NUM = (2, 8)
+
+	def __init__(self, starts, ends, kinds):
+		"""
+		:param starts: (S, 2) array with the first point of every segment
+		:param ends: (S, 2) array with the second point of every segment
+		:param kinds: (S,) array with LINE or POINT per segment
+		"""
+
+		self.starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+		self.ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+		self.kinds = np.asarray(kinds, dtype=int).reshape(-1)
+
+		self.dirs_num = np.asarray(self.DIRS_NUM)[self.kinds]
+		self.offsets = np.concatenate(([0], np.cumsum(self.dirs_num)[:-1])).astype(int)
+
+		# Segment and direction of every node
+		self.segment_ids = np.repeat(np.arange(len(self.kinds)), self.dirs_num)
+		self.directions = np.arange(len(self.segment_ids)) - self.offsets[self.segment_ids]
+
+		self.headings = self._get_headings()
+		self._segments = {}
+
+	@classmethod
+	def from_segments(cls, segments):
+		"""
+		Pack a list of LineSegment and PointSegment objects
+		"""
+
+		starts = np.empty((len(segments), 2))
+		ends = np.empty((len(segments), 2))
+		kinds = np.empty(len(segments), dtype=int)
+
+		for i, segment in enumerate(segments):
+			if isinstance(segment, PointSegment):
+				starts[i] = ends[i] = segment.coord
+				kinds[i] = cls.POINT
+			else:
+				starts[i], ends[i] = segment.coords
+				kinds[i] = cls.LINE
+
+		return cls(starts, ends, kinds)
+
+	def __len__(self):
+		return len(self.segment_ids)
+
+	def __getitem__(self, node):
+		return self.segment(self.segment_ids[node]), int(self.directions[node])
+
+	def num_segments(self):
+		return len(self.kinds)
+
+	def segment(self, k):
+		"""
+		Segment object of segment k, the same object on every call
+		"""
+
+		k = int(k)
+		if k not in self._segments:
+			if self.kinds[k] == self.POINT:
+				segment = PointSegment(tuple(self.starts[k].tolist()))
+			else:
+				segment = LineSegment([tuple(self.starts[k].tolist()), tuple(self.ends[k].tolist())])
+			self._segments[k] = segment
+
+		return self._segments[k]
+
+	def exit_poses(self):
+		"""
+		:return exits: (N, 3) array of (x, y, heading) exit poses
+		"""
+
+		# Direction 0 of a line leaves through its start, direction 1
+		# through its end
+		at_end = (self.directions == 1) & (self.kinds[self.segment_ids] == self.LINE)
+		points = np.where(at_end[:, np.newaxis], self.ends[self.segment_ids], self.starts[self.segment_ids])
+
+		return np.column_stack((points, self.headings))
+
+	def entrance_poses(self):
+		"""
+		:return entrances: (N, 3) array of (x, y, heading) entrance poses
+		"""
+
+		at_end = (self.directions == 0) & (self.kinds[self.segment_ids] == self.LINE)
+		points = np.where(at_end[:, np.newaxis], self.ends[self.segment_ids], self.starts[self.segment_ids])
+
+		return np.column_stack((points, self.headings))
+
+	def cluster_list(self):
+		"""
+		:return cluster_list: List of node ids per segment
+		"""
+
+		return [list(range(start, start+num)) for start, num in
+			zip(self.offsets.tolist(), self.dirs_num.tolist())]
+
+	def lengths(self):
+		"""
+		:return lengths: (S,) array with the length of every segment
+		"""
+
+		return np.sqrt(((self.ends-self.starts)**2).sum(axis=1))
+
+	def _get_headings(self):
+		"""
+		Heading of every node, computed as LineSegment and PointSegment do
+		"""
+
+		segment_ids = self.segment_ids
+		is_line = self.kinds[segment_ids] == self.LINE
+
+		# Direction 1 runs from start to end, direction 0 the other way
+		forward = np.where((self.directions == 1)[:, np.newaxis], 1.0, -1.0)
+		vectors = forward*(self.ends[segment_ids]-self.starts[segment_ids])
+		norms = np.sqrt((vectors**2).sum(axis=1))
+
+		with np.errstate(invalid='ignore', divide='ignore'):
+			line_headings = np.arccos(vectors[:, 0]/norms)
+		line_headings = np.where(vectors[:, 1] < 0, -line_headings, line_headings)
+
+		return np.where(is_line, line_headings, self.directions*pi/2)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def get_mapping(segments):
 	"""
 	Generate a dictionary which maps an integer to a segment and a direction
@@ -16,6 +19,73 @@ def get_mapping(segments):
 	return mapping
 
 
+def get_segment_array(segments):
+	"""
+	Pack segments into a SegmentArray, which numbers nodes as get_mapping
+	does and can be used wherever a mapping is expected
+
+	:param segments: List of LineSegment and PointSegment objects
+	:return mapping: SegmentArray
+	"""
+
+	return classes.SegmentArray.from_segments(segments)
+
+
+def get_node_keys(mapping, decimals=9):
+	"""
+	Generate a hashable key for every node, built from its rounded exit and
+	entrance poses. Nodes of two mappings with equal keys describe the same
+	transition end points, which lets results be carried across mappings.
+
+	:param mapping: Dictionary from node id to a (segment, direction) tuple
+	:param decimals: Rounding applied to the poses
+	:return keys: List of keys indexed by node id
+	"""
+
+	exits, entrances = dubins_batch.get_poses(mapping)
+
+	keys = []
+	for pose in np.hstack((exits, entrances)).tolist():
+		keys.append(tuple(round(x, decimals) for x in pose))
+
+	return keys
+
+
+def remap_tour(tour, old_mapping, new_mapping):
+	"""
+	Carry a tour over to a new mapping. Nodes whose exit and entrance poses
+	still exist keep their place in the tour, all others are dropped.
+
+	:param tour: List of node ids of old_mapping
+	:param old_mapping: Mapping the tour was computed on
+	:param new_mapping: Mapping to carry the tour over to
+	:return tour: Partial tour of node ids of new_mapping
+	"""
+
+	old_keys = get_node_keys(old_mapping)
+	new_ids = dict((key, i) for i, key in enumerate(get_node_keys(new_mapping)))
+
+	remapped = []
+	visited = set()
+	for node in tour:
+		new_node = new_ids.get(old_keys[node])
+		if new_node is None:
+			continue
+
+		# Visit every segment at most once
+		if hasattr(new_mapping, 'segment_ids'):
+			segment = int(new_mapping.segment_ids[new_node])
+		else:
+			segment = id(new_mapping[new_node][0])
+		if segment in visited:
+			continue
+
+		visited.add(segment)
+		remapped.append(new_node)
+
+	return remapped
+
+
 def get_tsp_mapping(segments):
 	"""
 	Generate a dictionary which maps an integer to a segment and a direction
@@ -28,4 +98,15 @@ def get_tsp_mapping(segments):
 	for i in range(len(segments)):
 		mapping[i] = (segment, 0)
 
-	return mapping
\ No newline at end of file
+	return mapping
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath(".."))
+		import classes
+		from costs import dubins_batch
+else:
+	from . import classes
+	from ..costs import dubins_batch
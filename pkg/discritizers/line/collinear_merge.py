@@ -0,0 +1,182 @@
+from math import floor
+from math import sqrt
+
+
+# Largest gap bridged between two segments, as a multiple of the width
+GAP_TOLERANCE = 1.5
+
+# Largest offset of a segment from the line of the other, as a fraction of
+# the width
+OFFSET_TOLERANCE = 0.1
+
+# Largest sine of the angle between two segments counted as parallel
+ANGLE_TOLERANCE = 1e-3
+
+
+def merge_cells(cells, adjacency_matrix, width):
+	"""
+	Fuse segments that continue each other across the boundary of two cells.
+
+	Neighbouring cells swept in the same direction produce line segments
+	that meet at their shared edge, each one a cluster of its own. Every
+	end point is hashed into a grid of the size of the largest gap, so the
+	candidates for an end point are found in the nine buckets around it.
+	Two ends are joined if their cells are adjacent, their segments are
+	parallel and collinear, they face each other across a gap crossing the
+	shared edge, and each one is the closest candidate of the other. Chains
+	of joined segments become single segments spanning their free ends.
+
+	:param cells: List with the segments of each cell, as discritize_cells
+	:param adjacency_matrix: Shared edges between cells, None if not adjacent
+	:param width: Distance between lines
+	:return segments: List of segments, a merged segment takes the place of
+		the first of its parts
+	"""
+
+	segments = []
+	cell_of = []
+	for k, cell in enumerate(cells):
+		segments.extend(cell)
+		cell_of.extend([k]*len(cell))
+
+	max_gap = GAP_TOLERANCE*width
+	max_offset = OFFSET_TOLERANCE*width
+
+	lines = [i for i, segment in enumerate(segments) if isinstance(segment, classes.LineSegment)]
+	units = {}
+	for i in lines:
+		(x0, y0), (x1, y1) = segments[i].coords
+		length = sqrt((x1-x0)**2 + (y1-y0)**2)
+		units[i] = ((x1-x0)/length, (y1-y0)/length)
+
+	# Spatial hash of the end points, an end is (segment, 0 or 1)
+	buckets = {}
+	for i in lines:
+		for end in (0, 1):
+			buckets.setdefault(_bucket(segments[i].coords[end], max_gap), []).append((i, end))
+
+	# Closest matching end of every end
+	best = {}
+	for i in lines:
+		for end in (0, 1):
+			point = segments[i].coords[end]
+			bx, by = _bucket(point, max_gap)
+
+			candidates = []
+			for dx in (-1, 0, 1):
+				for dy in (-1, 0, 1):
+					for j, other_end in buckets.get((bx+dx, by+dy), []):
+						if cell_of[j] == cell_of[i]:
+							continue
+
+						shared_edge = adjacency_matrix[cell_of[i]][cell_of[j]]
+						if shared_edge is None:
+							continue
+
+						other = segments[j].coords[other_end]
+						gap = sqrt((other[0]-point[0])**2 + (other[1]-point[1])**2)
+						if gap > max_gap:
+							continue
+
+						if _continues(point, _outward(units[i], end), other,
+							_outward(units[j], other_end), max_offset) and \
+							_crosses(point, other, shared_edge):
+							candidates.append((gap, j, other_end))
+
+			if candidates:
+				gap, j, other_end = min(candidates)
+				best[(i, end)] = (j, other_end)
+
+	# Keep mutual matches only
+	links = {}
+	for key, match in best.items():
+		if best.get(match) == key:
+			links[key] = match
+
+	merged = []
+	visited = set()
+	for i in range(len(segments)):
+		if i in visited:
+			continue
+
+		if i not in units or ((i, 0) not in links and (i, 1) not in links):
+			visited.add(i)
+			merged.append(segments[i])
+			continue
+
+		# Walk back to the free end of the chain, then forward along it
+		j, end = i, 0
+		seen = set([i])
+		while (j, end) in links:
+			j, end = links[(j, end)]
+			end = 1-end
+			if j in seen:
+				break
+			seen.add(j)
+
+		start = segments[j].coords[end]
+		end = 1-end
+		visited.add(j)
+		while (j, end) in links and links[(j, end)][0] not in visited:
+			j, end = links[(j, end)]
+			end = 1-end
+			visited.add(j)
+		stop = segments[j].coords[end]
+
+		merged.append(classes.LineSegment([start, stop]))
+
+	return merged
+
+
+def _bucket(point, size):
+	return int(floor(point[0]/size)), int(floor(point[1]/size))
+
+
+def _outward(unit, end):
+	"""
+	Direction pointing out of a segment through one of its ends
+	"""
+
+	if end == 1:
+		return unit
+	return (-unit[0], -unit[1])
+
+
+def _continues(p, u, q, v, max_offset):
+	"""
+	Test if an end at q with outward direction v continues the end at p with
+	outward direction u on the same line, facing it
+	"""
+
+	# Parallel and pointing at each other
+	if abs(u[0]*v[1]-u[1]*v[0]) > ANGLE_TOLERANCE or u[0]*v[0]+u[1]*v[1] > 0:
+		return False
+
+	dx, dy = q[0]-p[0], q[1]-p[1]
+	if dx*u[0]+dy*u[1] < 0:
+		return False
+
+	return abs(dx*u[1]-dy*u[0]) <= max_offset
+
+
+def _crosses(p, q, edge):
+	"""
+	Test if the segment pq crosses the shared edge
+	"""
+
+	a, b = edge[0], edge[-1]
+
+	def orientation(o, s, t):
+		return (s[0]-o[0])*(t[1]-o[1]) - (s[1]-o[1])*(t[0]-o[0])
+
+	return orientation(p, q, a)*orientation(p, q, b) <= 0 and \
+		orientation(a, b, p)*orientation(a, b, q) <= 0
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath(".."))
+		import classes
+else:
+	from .. import classes
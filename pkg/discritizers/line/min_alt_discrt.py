@@ -1,31 +1,84 @@
+import multiprocessing
+import numpy as np
 from shapely.geometry import LinearRing
 from shapely.geometry import LineString
 from shapely.geometry import Polygon
 from shapely import affinity
 
 
-def discritize_set(D, width):
+# Pieces of sweep lines shorter than this become point segments
+POINT_TOLERANCE = 1e-9
+
+# Rounding allowed in the finishing line test, as a fraction of the width
+SWEEP_TOLERANCE = 1e-9
+
+
+def discritize_set(D, width, workers=1):
 	"""
 	Wrapper for discritization. Given a set of polygon in standard form.
 	Generate segments
 	"""
 
 	segments = []
-	for poly in D:
-		segments.extend(discritize(poly, width))
+	for cell_segments in discritize_cells(D, width, workers):
+		segments.extend(cell_segments)
 
 	return segments
 
-def discritize(P, width):
+
+def discritize_cells(D, width, workers=1):
+	"""
+	Discritize every polygon of a set separately. The polygons are
+	independent, with more than one worker they are spread across a pool of
+	processes. The results are always in the order of D, so the numbering
+	of nodes by get_mapping does not depend on the number of workers.
+	:param D: list of polygons in standard form
+	:param width: distance between lines
+	:param workers: number of processes, None to use every core
+	:return cells: list with the segments of each polygon, in the order of D
+	"""
+
+	altitudes, thetas = alt.get_min_altitude_batch(D)
+	problems = [(poly, width, float(theta)) for poly, theta in zip(D, thetas)]
+
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	workers = min(workers, len(problems))
+
+	if workers <= 1:
+		return [_discritize_cell(problem) for problem in problems]
+
+	pool = multiprocessing.Pool(workers)
+	try:
+		cells = pool.map(_discritize_cell, problems, chunksize=1)
+	finally:
+		pool.close()
+		pool.join()
+
+	return cells
+
+
+def _discritize_cell(problem):
+	"""
+	Segments of one polygon along a given direction
+	"""
+
+	P, width, theta = problem
+	return discritize(P, width, theta)
+
+
+def discritize(P, width, theta=None):
 	"""
 	Function will discritize the free space of a given polygon with minimum
 	number of lines
 	:param P: polygon in standard form
 	:param width: distance between lines
+	:param theta: direction of the lines, the min altitude one if None
 	:return lines: a set of segments which could be lines of points
 	"""
 
-	altitude, theta = alt.get_min_altitude(P)
+	if theta is None:
+		altitude, theta = alt.get_min_altitude(P)
 	segments = populate_with_lines(P, width, theta)
 
 	return segments
@@ -41,7 +94,7 @@ def populate_with_lines(P, width, theta):
 		Get the chains of exterior and holes
 		Parallel offset them by width in appropriate directions
 		Create a polygon with the new chains
-		If valid, generate lines on this
+		If valid, sweep the lines over its edges in one pass
 		Return coordinates
 
 	Thigns to watch out for:
@@ -69,7 +122,6 @@ def populate_with_lines(P, width, theta):
 		lr_new_holes.append(offset_hole)
 
 	if offset_ext.is_empty:
-		print offset_ext
 		print("Line generation ERROR: Shrunk polygon is not valid")
 		return []
 	
@@ -81,62 +133,124 @@ def populate_with_lines(P, width, theta):
 
 
 	minx, miny, maxx, maxy = shrunk_polygon.bounds
+	sweep_xs = get_sweep_positions(minx, maxx, width)
 
-	# Start generating lines from left to right equidistance from each other
-	segments = []
-	cur_x = minx
-	finishing_touches = False
+	rings = [shrunk_polygon.exterior.coords]
+	rings.extend([interior.coords for interior in shrunk_polygon.interiors])
+	lines, starts, ends = sweep_rings(rings, sweep_xs)
 
-	while (cur_x <= maxx) or (finishing_touches):
+	# Rotate all end points back at once
+	cos_th, sin_th = np.cos(theta), np.sin(theta)
+	rotation_matrix = np.array([[cos_th, sin_th], [-sin_th, cos_th]])
+	starts = np.dot(starts, rotation_matrix)
+	ends = np.dot(ends, rotation_matrix)
 
-		if finishing_touches:
-			cur_x = maxx-0.001
+	segments = []
+	for i in range(len(lines)):
+		start = (float(starts[i, 0]), float(starts[i, 1]))
+		end = (float(ends[i, 0]), float(ends[i, 1]))
 
-		# Crudely deal with the very first line
-		if cur_x == minx:
-			test_line = LineString([(cur_x+0.001, miny), (cur_x+0.001, maxy)])
+		if np.hypot(end[0]-start[0], end[1]-start[1]) <= POINT_TOLERANCE:
+			segments.append(classes.PointSegment(start))
 		else:
-			test_line = LineString([(cur_x, miny), (cur_x, maxy)])
-
-
-		intersection = shrunk_polygon.intersection(test_line)
-		# Handle each type of intersection separatly
-		if intersection.geom_type == "Point":
-			new_coord = rotation.rotate_points(intersection.coords[:], theta)
-			segments.append(classes.PointSegment(*new_coord))
-		elif intersection.geom_type == "LineString":
-			# Rotate back and append
-			new_coords = rotation.rotate_points(intersection.coords[:], theta)
-			segments.append(classes.LineSegment(new_coords))
-		elif intersection.geom_type == "MultiLineString":
-			for line in intersection:
-				new_coords = rotation.rotate_points(line.coords[:], theta)
-				segments.append(classes.LineSegment(new_coords))
-		elif intersection.geom_type == "GeometricCollection":
-			for element in intersection:
-				if element.geom_type == "Point":
-					new_coord = rotation.rotate_points(element.coords[:], theta)
-					segments.append(classes.PointSegment(*new_coord))
-				elif element.geom_type == "LineString":
-					new_coords = rotation.rotate_points(element.coords[:], theta)
-					segments.append(classes.LineSegment(new_coords))
-				elif element.geom_type == "MultiLineString":
-					for line in element:
-						new_coords = rotation.rotate_points(line.coords[:], theta)
-						segments.append(classes.LineSegment(new_coords))
+			segments.append(classes.LineSegment([start, end]))
 
+	return segments
+
+
+def get_sweep_positions(minx, maxx, width):
+	"""
+	Positions of the sweep lines from left to right, width appart. The very
+	first line is nudged inside the polygon, and one more line is added near
+	the right end if the last regular line falls short of it by up to half
+	the width. Positions are accumulated step by step as the original line
+	generator did, and the half width test allows for float rounding, so
+	the finishing line is not lost when the remainder is exactly half the
+	width.
+	:param minx: left bound of the shrunk polygon
+	:param maxx: right bound of the shrunk polygon
+	:param width: distance between lines
+	:return sweep_xs: ndarray of x coordinates in sweep order
+	"""
+
+	sweep_xs = []
+	cur_x = minx
+	while cur_x <= maxx:
+		sweep_xs.append(cur_x)
 		cur_x += width
 
-		if (cur_x > maxx) and (cur_x <= maxx+width/2):
-			finishing_touches = True
-		else:
-			finishing_touches = False
+	if cur_x <= maxx+width/2+SWEEP_TOLERANCE*width:
+		sweep_xs.append(maxx-0.001)
 
+	sweep_xs = np.array(sweep_xs)
+	sweep_xs[0] += 0.001
 
-	# Process the last segment
+	return sweep_xs
 
 
-	return segments
+def sweep_rings(rings, sweep_xs):
+	"""
+	Intersect vertical sweep lines with the region bounded by a set of rings.
+
+	Every edge spans a range of sweep lines, found by binary search over the
+	sorted positions. The crossings of all edges with all lines are computed
+	in one vectorized pass, sorted along each line, and consecutive pairs
+	of crossings bound the pieces of the line inside the region. An edge
+	covers its x range half-open, so a line through a vertex is crossed
+	once by the two edges meeting there.
+	:param rings: list of closed rings, each a sequence of (x, y) points
+	:param sweep_xs: x coordinates of the sweep lines
+	:return lines: ndarray with the index of the sweep line of every piece
+	:return starts: ndarray (n, 2) with the lower end of every piece
+	:return ends: ndarray (n, 2) with the upper end of every piece
+	"""
+
+	sweep_xs = np.asarray(sweep_xs, dtype=float)
+	order = np.argsort(sweep_xs, kind='mergesort')
+	sorted_xs = sweep_xs[order]
+
+	edges = []
+	for ring in rings:
+		points = np.asarray(ring, dtype=float).reshape(-1, 2)
+		if len(points) > 1:
+			edges.append(np.hstack((points[:-1], points[1:])))
+
+	if not edges:
+		return np.zeros(0, dtype=int), np.zeros((0, 2)), np.zeros((0, 2))
+
+	edges = np.vstack(edges)
+	edges = edges[edges[:, 0] != edges[:, 2]]
+	x0, y0, x1, y1 = edges.T
+
+	# Sweep lines crossed by every edge, xmin <= x < xmax
+	first = np.searchsorted(sorted_xs, np.minimum(x0, x1), side='left')
+	last = np.searchsorted(sorted_xs, np.maximum(x0, x1), side='left')
+	counts = np.maximum(last-first, 0)
+
+	edge_ids = np.repeat(np.arange(len(edges)), counts)
+	offsets = np.cumsum(counts)-counts
+	positions = np.repeat(first-offsets, counts) + np.arange(len(edge_ids))
+
+	xs = sorted_xs[positions]
+	slopes = (y1-y0)/(x1-x0)
+	ys = y0[edge_ids] + (xs-x0[edge_ids])*slopes[edge_ids]
+	lines = order[positions]
+
+	# Sort the crossings along each line, keep an even number per line
+	by_line = np.lexsort((ys, lines))
+	lines, xs, ys = lines[by_line], xs[by_line], ys[by_line]
+
+	per_line = np.bincount(lines, minlength=len(sweep_xs))
+	line_starts = np.cumsum(per_line)-per_line
+	rank = np.arange(len(lines)) - line_starts[lines]
+	keep = rank < per_line[lines] - per_line[lines]%2
+	lines, xs, ys = lines[keep], xs[keep], ys[keep]
+
+	lines = lines[0::2]
+	starts = np.column_stack((xs[0::2], ys[0::2]))
+	ends = np.column_stack((xs[1::2], ys[1::2]))
+
+	return lines, starts, ends
 
 
 if __name__ == '__main__':
@@ -144,14 +258,14 @@ if __name__ == '__main__':
 		import os, sys
 		sys.path.insert(0, os.path.abspath("../.."))
 		from aux.geometry import edges
-		from aux.altitudes import altitude as alt
+		from aux.altitudes import altitude_cache as alt
 		from aux.geometry import rotation
 
 		sys.path.insert(0, os.path.abspath(".."))
 		import classes
 else:
 	from ...aux.geometry import rotation
-	from ...aux.altitudes import altitude as alt
+	from ...aux.altitudes import altitude_cache as alt
 	from ...poly_operations.others import directions
 	from .. import classes
 
@@ -5,8 +5,21 @@ from shapely.geometry import LinearRing
 from shapely.geometry import Polygon
 from shapely.geometry import Point
 
+# Shapely 2 tests arrays of points directly, older versions only through
+# the vectorized module
+try:
+	from shapely import intersects_xy
+except ImportError:
+	from shapely import vectorized
+	intersects_xy = None
 
-def discritize_polygon(P, r):
+
+# Lattices the points can be laid out on
+HEX = 'hex'
+SQUARE = 'square'
+
+
+def discritize_polygon(P, r, lattice=SQUARE):
 	"""
 	This function will generate a lattice inside a polygon.
 	The lattice will be a function of the radius of the sweeping tool.
@@ -14,10 +27,35 @@ def discritize_polygon(P, r):
 	The grid points are the center-points of the hexagons.
 	:param P: A shapely Polygob object representing the P
 	:param r: Radius of the circular sweeping tool
+	:param lattice: SQUARE, the layout of the stored tours, or HEX
 	:return: List of grid points
 	"""
 
-	separation_distance = r*math.sqrt(2)
+	xs, ys = get_lattice(P, r, lattice)
+
+	segments = []
+	for x, y in zip(xs.tolist(), ys.tolist()):
+		segments.append(classes.PointSegment((x, y)))
+
+	return segments
+
+
+def get_lattice(P, r, lattice=SQUARE):
+	"""
+	Lattice points inside a polygon shrunk by the radius of the tool.
+
+	All candidate points over the bounds of the shrunk polygon are built at
+	once and filtered by a single vectorized point in polygon test, holes
+	included. On a HEX lattice the circles of radius r around the points
+	are the circumscribed circles of hexagons tiling the plane, rows are
+	1.5*r apart and every other row is shifted by half the spacing. On a
+	SQUARE lattice the points are r*sqrt(2) apart in both directions.
+	:param P: Polygon in the standard form
+	:param r: Radius of the circular sweeping tool
+	:param lattice: SQUARE, the layout of the stored tours, or HEX
+	:return xs: ndarray with x coordinates of the points
+	:return ys: ndarray with y coordinates of the points
+	"""
 
 	## Shrink the P
 	ext = LinearRing(P[0]).parallel_offset(r, 'left')
@@ -30,20 +68,35 @@ def discritize_polygon(P, r):
 	new_P = Polygon(ext.coords[:], interiors)
 	minx, miny, maxx, maxy = new_P.bounds
 
+	if lattice == HEX:
+		dx = r*math.sqrt(3)
+		dy = 1.5*r
 
-	x_range = list(np.arange(minx, maxx, separation_distance))
-	y_range = list(np.arange(miny, maxy, separation_distance))
+		x_range = np.arange(minx, maxx+dx/2, dx)
+		y_range = np.arange(miny, maxy, dy)
 
-	## Test if points are inside the polygon, and generate a list of points
-	segments = []
-	for i in range(len(y_range)):
-		for j in range(len(x_range)):
-			pt = Point((x_range[j], y_range[i]))
+		xs, ys = np.meshgrid(x_range, y_range)
+		xs = xs + (np.arange(len(y_range)) % 2)[:, np.newaxis]*dx/2
+	elif lattice == SQUARE:
+		separation_distance = r*math.sqrt(2)
 
-			if new_P.intersects(pt):
-				segments.append(classes.PointSegment((pt.x, pt.y)))
-	## ----------------------------------------------------------------
-	return segments
+		x_range = np.arange(minx, maxx, separation_distance)
+		y_range = np.arange(miny, maxy, separation_distance)
+
+		xs, ys = np.meshgrid(x_range, y_range)
+	else:
+		raise ValueError("Unknown lattice: %s"%(lattice,))
+
+	xs = xs.ravel()
+	ys = ys.ravel()
+
+	## Keep the points inside the polygon or on its boundary
+	if intersects_xy is not None:
+		inside = intersects_xy(new_P, xs, ys)
+	else:
+		inside = vectorized.contains(new_P, xs, ys) | vectorized.touches(new_P, xs, ys)
+
+	return xs[inside], ys[inside]
 
 
 if __name__ == '__main__':
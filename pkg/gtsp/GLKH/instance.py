@@ -0,0 +1,238 @@
+import hashlib
+import numpy as np
+
+
+# Upper bound on the number of matrix entries formatted or hashed per block
+BLOCK_SIZE = 2**20
+
+
+def write_parameters(filename, problem_file, tour_file, settings=None):
+	"""
+	Write the parameter file GLKH is launched with
+
+	:param filename: Path of the parameter file
+	:param problem_file: Path of the problem file
+	:param tour_file: Path the solver writes the tour to
+	:param settings: Additional solver settings
+	"""
+
+	settings_dict = { 'PROBLEM_FILE': problem_file,
+			'OUTPUT_TOUR_FILE': tour_file,
+			#'ASCENT_CANDIDATES': 500,
+			#'INITIAL_PERIOD': 1000,
+			#'MAX_CANDIDATES': 30,
+			#'MAX_TRIALS': 1000,
+			#'POPULATION_SIZE': 5,
+			#'PRECISION': 10,
+			#'SEED': 1,
+			#'TRACE_LEVEL': 1,
+			'RUNS': 1}
+
+	if settings is not None:
+		settings_dict.update(settings)
+
+	with open(filename, 'w') as f:
+
+		for k, v in settings_dict.items():
+			f.write(k+' = '+str(v)+'\n')
+
+
+def write_problem(filename, problem_name, cost_matrix, cluster_array, symmetric=None):
+	"""
+	Write the GTSP instance in the GLKH format
+
+	The matrix is streamed in blocks of rows, each block formatted with a
+	single string operation. Symmetric costs are written as LOWER_DIAG_ROW,
+	halving the file. GLKH only reads EXPLICIT weights from a full weight
+	section, so sparse cost matrices are written with every transition that
+	is not a candidate edge at their default penalty.
+
+	:param filename: Path of the problem file
+	:param problem_name: The name of the problem
+	:param cost_matrix: Matrix with costs
+	:param cluster_array: Information about clusters
+	:param symmetric: Whether the costs are symmetric, taken from the cost
+		matrix if it knows, detected otherwise
+	"""
+
+	num_nodes = len(cost_matrix)
+	num_clusters = len(cluster_array)
+
+	if symmetric is None:
+		symmetric = getattr(cost_matrix, 'symmetric', None)
+
+	# Sparse cost matrices are not densified just to test symmetry
+	if symmetric is None:
+		symmetric = not hasattr(cost_matrix, 'edges') and is_symmetric(cost_matrix)
+
+	props = [('NAME', problem_name),
+			('COMMENT', problem_name+': CPP using GTSP solver'),
+			('TYPE', 'GTSP' if symmetric else 'AGTSP'),
+			('DIMENSION', num_nodes),
+			('GTSP_SETS', num_clusters),
+			('EDGE_WEIGHT_TYPE', 'EXPLICIT'),
+			('EDGE_WEIGHT_FORMAT', 'LOWER_DIAG_ROW' if symmetric else 'FULL_MATRIX')]
+
+	with open(filename, "w") as f:
+
+		for k, v in props:
+			f.write(k+' = '+str(v)+'\n')
+
+
+		f.write("EDGE_WEIGHT_SECTION\n")
+
+		for start, stop in _row_blocks(num_nodes):
+			block = _row_block(cost_matrix, start, stop)
+			if symmetric:
+				for i in range(start, stop):
+					f.write(_format_rows(block[i-start:i-start+1, :i+1]))
+			else:
+				f.write(_format_rows(block))
+
+		f.write("GTSP_SET_SECTION\n")
+
+		offset = 1 if cluster_array[0][0] == 0 else 0
+		for i in range(num_clusters):
+			nodes = " ".join([str(node+offset) for node in cluster_array[i]])
+			f.write("%d %s -1\n"%(i+1, nodes))
+
+		f.write("EOF\n")
+
+
+def instance_key(cost_matrix, cluster_array, settings=None):
+	"""
+	Content hash of a GTSP instance and the settings it is solved with
+
+	:param cost_matrix: Matrix with costs
+	:param cluster_array: Information about clusters
+	:param settings: Anything else the result depends on, must have a
+		stable repr
+	:return key: Hex digest
+	"""
+
+	num_nodes = len(cost_matrix)
+
+	h = hashlib.sha1()
+	h.update(repr((num_nodes, settings)).encode('utf-8'))
+
+	if hasattr(cost_matrix, 'edges'):
+		h.update(repr(int(cost_matrix.default)).encode('utf-8'))
+		for array in cost_matrix.edges():
+			h.update(np.asarray(array, dtype=np.int64).tobytes())
+	else:
+		for start, stop in _row_blocks(num_nodes):
+			h.update(_row_block(cost_matrix, start, stop).tobytes())
+
+	for cluster in cluster_array:
+		h.update(np.asarray(cluster, dtype=np.int64).tobytes())
+		h.update(b'|')
+
+	return h.hexdigest()
+
+
+def is_symmetric(cost_matrix):
+	"""
+	Check whether the integer costs of a matrix are symmetric
+
+	:param cost_matrix: Matrix with costs
+	:return: True if cost i to j equals cost j to i for all pairs
+	"""
+
+	costs = np.asarray(cost_matrix)
+
+	num_nodes = len(costs)
+	for start, stop in _row_blocks(num_nodes):
+		if not np.array_equal(_as_int(costs[start:stop]), _as_int(costs[:, start:stop].T)):
+			return False
+
+	return True
+
+
+def _row_blocks(num_nodes):
+	"""
+	Split the rows of a square matrix into contiguous (start, stop) ranges
+	"""
+
+	block_rows = max(1, BLOCK_SIZE//max(num_nodes, 1))
+	return [(start, min(start+block_rows, num_nodes)) for start in range(0, num_nodes, block_rows)]
+
+
+def _as_int(block):
+	"""
+	Truncate costs towards zero as %d formatting does
+	"""
+
+	return block.astype(np.int64)
+
+
+def _row_block(cost_matrix, start, stop):
+	"""
+	Rows [start, stop) of a cost matrix as an integer ndarray
+	"""
+
+	if hasattr(cost_matrix, 'rows'):
+		return _as_int(np.asarray(cost_matrix.rows(start, stop)))
+
+	if isinstance(cost_matrix, np.ndarray):
+		return _as_int(cost_matrix[start:stop])
+
+	return _as_int(np.array([cost_matrix[i] for i in range(start, stop)]))
+
+
+def _format_rows(block):
+	"""
+	Format a 2D integer block as space separated lines in one operation
+	"""
+
+	num_rows, num_cols = block.shape
+	if not num_rows:
+		return ""
+
+	line = " ".join(["%d"]*num_cols)+"\n"
+	return (line*num_rows)%tuple(block.ravel().tolist())
+
+
+def write_tour(filename, problem_name, tour):
+	"""
+	Write a tour in the format GLKH reads initial tours in
+
+	:param filename: Path of the tour file
+	:param problem_name: The name of the problem
+	:param tour: List of 0-based node ids
+	"""
+
+	with open(filename, 'w') as f:
+		f.write("NAME : "+problem_name+".tour\n")
+		f.write("TYPE : TOUR\n")
+		f.write("DIMENSION : %d\n"%len(tour))
+		f.write("TOUR_SECTION\n")
+
+		for node in tour:
+			f.write("%d\n"%(node+1))
+
+		f.write("-1\n")
+		f.write("EOF\n")
+
+
+def parse_tour(filename):
+	"""
+	Read a tour written by GLKH
+
+	:param filename: Path of the tour file
+	:return tour: List of 0-based node ids
+	"""
+
+	with open(filename, 'r') as f:
+		# Skip the header
+		str = f.readline()
+		while str and "TOUR_SECTION" not in str:
+			str = f.readline()
+
+		tour = []
+		str = f.readline()
+		while str and "EOF" not in str and "-1" not in str:
+			tour.append(int(str)-1)
+			str = f.readline()
+
+	return tour
+
@@ -0,0 +1,145 @@
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
+
+
+# Solver configurations tried by default, each one is run with every seed
+DEFAULT_CONFIGS = [
+	{},
+	{'MAX_TRIALS': 1000},
+	{'MAX_TRIALS': 1000, 'POPULATION_SIZE': 5},
+	{'MAX_CANDIDATES': 30, 'ASCENT_CANDIDATES': 500, 'INITIAL_PERIOD': 1000}]
+
+# Default seeds every configuration is run with
+DEFAULT_SEEDS = [1, 2]
+
+# Extra time granted to a run past the deadline before it is killed
+GRACE_PERIOD = 5
+
+
+def solve(problem_name, solver_loc, cost_matrix, cluster_list, deadline=60,
+	configs=None, seeds=None, workers=None, log_file=None):
+	"""
+	Run a portfolio of solver configurations and keep the cheapest tour.
+
+	Every configuration is run with every seed, as many at a time as there
+	are workers. Runs are told to stop at the deadline through TIME_LIMIT
+	and killed shortly after it, runs that did not produce a tour are
+	ignored. The costs of all runs are appended to the log file as one
+	JSON record, so default settings can be tuned from collected data.
+
+	:param problem_name: The name of the problem
+	:param solver_loc: Path to the directory holding the GLKH binary
+	:param cost_matrix: Matrix with costs
+	:param cluster_list: List of node ids per cluster
+	:param deadline: Wall-clock budget of the whole portfolio in seconds
+	:param configs: List of dictionaries of solver settings
+	:param seeds: List of seeds
+	:param workers: Number of simultaneous runs, None to use every core
+	:param log_file: File the results are appended to, nothing is logged
+		if None
+	:return tour: Cheapest tour found, None if no run finished
+	:return settings: Settings of the run that found it
+	"""
+
+	if configs is None:
+		configs = DEFAULT_CONFIGS
+	if seeds is None:
+		seeds = DEFAULT_SEEDS
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+
+	start_time = time.time()
+	stop_time = start_time + deadline
+
+	runs = []
+	for config in configs:
+		for seed in seeds:
+			settings = dict(config)
+			settings['SEED'] = seed
+			runs.append(settings)
+
+	work_dir = tempfile.mkdtemp(prefix=problem_name+'.')
+	try:
+		problem_file = os.path.join(work_dir, problem_name+'.gtsp')
+		instance.write_problem(problem_file, problem_name, cost_matrix, cluster_list)
+
+		def run_one(k):
+			remaining = stop_time - time.time()
+			if remaining <= 0:
+				return None
+
+			settings = dict(runs[k])
+			settings['TIME_LIMIT'] = remaining
+
+			par_file = os.path.join(work_dir, "%s.%d.par"%(problem_name, k))
+			tour_file = os.path.join(work_dir, "%s.%d.tour"%(problem_name, k))
+			instance.write_parameters(par_file, problem_file, tour_file, settings)
+
+			# Runs that fail, time out or leave no readable tour are ignored
+			try:
+				runner.launch(solver_loc, par_file, remaining+GRACE_PERIOD)
+				tour = instance.parse_tour(tour_file)
+			except (EnvironmentError, ValueError, subprocess.CalledProcessError,
+				runner.SolverTimeout):
+				return None
+
+			return tour, time.time()-start_time
+
+		pool = ThreadPool(max(1, min(workers, len(runs))))
+		try:
+			results = pool.map(run_one, range(len(runs)), chunksize=1)
+		finally:
+			pool.close()
+			pool.join()
+
+	finally:
+		shutil.rmtree(work_dir, ignore_errors=True)
+
+	best = None
+	records = []
+	for k, result in enumerate(results):
+		record = {'settings': runs[k], 'cost': None, 'time': None}
+
+		if result is not None and len(result[0]) == len(cluster_list):
+			tour, elapsed = result
+			record['cost'] = native_solver.tour_cost(cost_matrix, tour)
+			record['time'] = elapsed
+
+			if best is None or record['cost'] < records[best]['cost']:
+				best = k
+
+		records.append(record)
+
+	if log_file is not None:
+		with open(log_file, 'a') as f:
+			f.write(json.dumps({'problem': problem_name,
+				'nodes': len(cost_matrix),
+				'clusters': len(cluster_list),
+				'deadline': deadline,
+				'winner': best,
+				'runs': records})+'\n')
+
+	if best is None:
+		return None, None
+
+	return results[best][0], runs[best]
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import instance
+		import runner
+		from gtsp.native import solver as native_solver
+else:
+	from . import instance
+	from . import runner
+	from ..native import solver as native_solver
@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from multiprocessing.pool import ThreadPool
+
+
+# Default wall-clock limit of a single solver run in seconds
+DEFAULT_TIMEOUT = 600
+
+
+class SolverTimeout(RuntimeError):
+	"""
+	Raised when a solver run exceeds its time limit
+	"""
+
+
+def run(problem_name, solver_loc, cost_matrix, cluster_list, timeout=DEFAULT_TIMEOUT,
+	log_dir=None, settings=None, initial_tour=None):
+	"""
+	Solve one GTSP instance with GLKH in a private directory.
+
+	The instance is written into a fresh temporary directory, the solver is
+	started there as a subprocess and the tour is parsed back. Nothing
+	depends on the working directory of the calling process, so any number
+	of runs can be in flight at the same time.
+
+	:param problem_name: The name of the problem
+	:param solver_loc: Path to the directory holding the GLKH binary
+	:param cost_matrix: Matrix with costs
+	:param cluster_list: List of node ids per cluster
+	:param timeout: Wall-clock limit in seconds, None to wait indefinitely
+	:param log_dir: Directory the instance, parameter and tour files are
+		copied to, nothing is kept if None
+	:param settings: Additional solver settings
+	:param initial_tour: Tour visiting every cluster the solver starts from
+	:return tour: List of 0-based node ids
+	"""
+
+	work_dir = tempfile.mkdtemp(prefix=problem_name+'.')
+	try:
+		problem_file = os.path.join(work_dir, problem_name+'.gtsp')
+		par_file = os.path.join(work_dir, problem_name+'.par')
+		tour_file = os.path.join(work_dir, problem_name+'.tour')
+
+		instance.write_problem(problem_file, problem_name, cost_matrix, cluster_list)
+
+		if initial_tour is not None:
+			initial_file = os.path.join(work_dir, problem_name+'.init.tour')
+			instance.write_tour(initial_file, problem_name, initial_tour)
+
+			settings = dict(settings or {})
+			settings['INITIAL_TOUR_FILE'] = initial_file
+
+		instance.write_parameters(par_file, problem_file, tour_file, settings)
+
+		launch(solver_loc, par_file, timeout)
+
+		if log_dir is not None:
+			for filename in (problem_file, par_file, tour_file):
+				if os.path.exists(filename):
+					shutil.copy(filename, log_dir)
+
+		return instance.parse_tour(tour_file)
+
+	finally:
+		shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_many(problems, solver_loc, workers=None, timeout=DEFAULT_TIMEOUT, log_dir=None,
+	settings=None):
+	"""
+	Solve several GTSP instances concurrently.
+
+	Every instance gets its own run, the threads only wait on the solver
+	subprocesses.
+
+	:param problems: List of (problem_name, cost_matrix, cluster_list) tuples,
+		names must be unique when log_dir is given
+	:param solver_loc: Path to the directory holding the GLKH binary
+	:param workers: Number of simultaneous runs, None to use every core
+	:param timeout: Wall-clock limit of each run in seconds
+	:param log_dir: Directory the solver files are copied to
+	:param settings: Additional solver settings
+	:return tours: List of tours in the order of problems
+	"""
+
+	def solve_one(problem):
+		problem_name, cost_matrix, cluster_list = problem
+		return run(problem_name, solver_loc, cost_matrix, cluster_list, timeout,
+			log_dir, settings)
+
+	pool = ThreadPool(workers)
+	try:
+		return pool.map(solve_one, problems, chunksize=1)
+	finally:
+		pool.close()
+		pool.join()
+
+
+def launch(solver_loc, par_file, timeout=DEFAULT_TIMEOUT):
+	"""
+	Run GLKH on a parameter file. The solver is started in the directory of
+	the parameter file and its output goes to a .log file next to it.
+
+	:param solver_loc: Path to the directory holding the GLKH binary
+	:param par_file: Path of the parameter file
+	:param timeout: Wall-clock limit in seconds, None to wait indefinitely
+	"""
+
+	work_dir = os.path.dirname(os.path.abspath(par_file))
+	cmd = [os.path.join(os.path.abspath(solver_loc), 'GLKH'), os.path.abspath(par_file)]
+
+	with open(os.path.splitext(par_file)[0]+'.log', 'w') as log:
+		_call(cmd, work_dir, log, timeout)
+
+
+def _call(cmd, cwd, log, timeout):
+	"""
+	Run a command and kill it once the timeout expires
+	"""
+
+	proc = subprocess.Popen(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+
+	expired = []
+	def kill():
+		expired.append(True)
+		proc.kill()
+
+	timer = None
+	if timeout is not None:
+		timer = threading.Timer(timeout, kill)
+		timer.start()
+
+	try:
+		returncode = proc.wait()
+	finally:
+		if timer is not None:
+			timer.cancel()
+
+	if expired:
+		raise SolverTimeout("%s did not finish within %s seconds"%(cmd[0], timeout))
+
+	if returncode != 0:
+		raise subprocess.CalledProcessError(returncode, cmd)
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import instance
+else:
+	from . import instance
@@ -1,154 +1,88 @@
 import os
+import numpy as np
 
 
-def solve(problem_name, solver_loc, cost_matrix, cluster_array):
+# Solver files of every instance are kept in pkg/gtsp/solver_logs
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'solver_logs')
+
+
+def solve(problem_name, solver_loc, cost_matrix, cluster_array, timeout=None,
+	initial_tour=None, old_mapping=None, mapping=None, settings=None, cache=None):
 	"""
 	This function will generate appropriate files for GTSP
 	solver and start the solver.
 
+	The instance is solved in a private temporary directory, the solver
+	files are kept in pkg/gtsp/solver_logs for read_tour.
+
+	A previous tour warm starts the solver. Given the mapping it was
+	computed on and the current one, it is carried over to the current
+	nodes first, and clusters it does not visit are inserted cheapest
+	first.
+
+	With a cache, instances already solved with the same settings and
+	starting tour are not handed to the solver again. The stored tour is
+	returned and written to pkg/gtsp/solver_logs as if it was solved.
+
 	:param problem_name: The name of the problem, useful for problem_names
 	:param solver_loc: path to the solver
 	:param cost_matrix: Matrix with costs
 	:param cluster_array: Information about clusters
+	:param timeout: Wall-clock limit in seconds, None to wait indefinitely
+	:param initial_tour: Previous tour to start from
+	:param old_mapping: Mapping of the previous tour
+	:param mapping: Mapping of the current instance
+	:param settings: Additional solver settings
+	:param cache: NpzCache of solved tours, nothing is cached if None
 	:return tour: Tour
 	"""
 
-	num_nodes = len(cost_matrix)
-	num_clusters = len(cluster_array)
-
-	is_simple = False
-	if is_simple:
-
-		props_simp_dict = {'N': num_nodes,
-						'M': num_clusters,
-				   		'Symmetric': 'false',
-				   		'Triangle': 'false'}
-
-		with open(problem_name+".txt", "w") as f:
-			# Write the problem properties first
-			for k, v in props_simpl_dict.iteritems():
-				f.write(k+': '+str(v)+'\n')
-
-			# Write the node in cluster information
-			for i in range(num_clusters):
-				row = ""
-				for j in range(len(cluster_array[i])):
-					row += "%d "%(cluster_array[i][j])
-
-				row += "\n"
-				f.write(row)
-
-			# Write the cost matrix
-			for i in range(num_nodes):
-				row = ""
-				for j in range(num_nodes):
-					row += "%5d "%cost_matrix[i][j]
-				f.write(row+"\n")
-		os.system("cp "+problem_name+".txt "+'gtsp_related/')
-
-	else:
-
-		settings_dict = { 'PROBLEM_FILE': problem_name+'.gtsp',
-				'OUTPUT_TOUR_FILE': problem_name+'.tour',
-				#'ASCENT_CANDIDATES': 500,
-				#'INITIAL_PERIOD': 1000,
-				#'MAX_CANDIDATES': 30,
-				#'MAX_TRIALS': 1000,
-				#'POPULATION_SIZE': 5,
-				#'PRECISION': 10,
-				#'SEED': 1,
-				#'TRACE_LEVEL': 1,
-				'RUNS': 1}
-
-		props_dict = { 'NAME': problem_name,
-				'COMMENT': problem_name+': CPP using GTSP solver',
-				'TYPE': 'AGTSP',
-				'DIMENSION': num_nodes,
-				'GTSP_SETS': num_clusters,
-				'EDGE_WEIGHT_TYPE': 'EXPLICIT',
-				'EDGE_WEIGHT_FORMAT': 'FULL_MATRIX'}
-
-		
-		# Write GTSP instance settings
-		with open(problem_name+'.par', 'w') as f:
-
-			for k, v in settings_dict.iteritems():
-				f.write(k+' = '+str(v)+'\n')
-
-		# Write GTSP instance properties
-		with open(problem_name+".gtsp", "w") as f:
+	if initial_tour is not None:
+		if old_mapping is not None and mapping is not None:
+			initial_tour = get_mapping.remap_tour(initial_tour, old_mapping, mapping)
+		initial_tour = native_solver.complete_tour(cost_matrix, cluster_array, initial_tour)
 
-			for k, v in props_dict.iteritems():
-				f.write(k+' = '+str(v)+'\n')
+	if cache is not None:
+		settings_key = sorted((settings or {}).items())
+		if initial_tour is not None:
+			initial_key = [int(node) for node in initial_tour]
+		else:
+			initial_key = None
 
+		key = instance.instance_key(cost_matrix, cluster_array,
+			('GLKH', settings_key, initial_key))
+		data = cache.get(key)
+		if data is not None:
+			tour = [int(node) for node in data['tour']]
+			instance.write_tour(os.path.join(LOG_DIR, problem_name+'.tour'), problem_name, tour)
+			return tour
 
-			f.write("EDGE_WEIGHT_SECTION\n")
+	tour = runner.run(problem_name, solver_loc, cost_matrix, cluster_array, timeout, LOG_DIR,
+		settings, initial_tour)
 
-			for i in range(num_nodes):
-				row = ""
-				for j in range(num_nodes):
-					row += "%5d "%cost_matrix[i][j]
+	if cache is not None:
+		cache.put(key, tour=np.asarray(tour, dtype=np.int64))
 
-				f.write(row+"\n")
-		
-			f.write("GTSP_SET_SECTION\n")
-
-			for i in range(num_clusters):
-				row = "%d "%(i+1)
-				for j in range(len(cluster_array[i])):
-					if cluster_array[0][0] == 0:
-						row += "%d "%(cluster_array[i][j]+1)
-					else:
-						row += "%d "%(cluster_array[i][j])
-
-				row += "-1\n"
-				f.write(row)
-
-
-
-			f.write("EOF\n")
-			f.write("")
-
-		# Move the files to GTSP solver location
-		os.system("cp "+problem_name+".gtsp "+'/pkg/gtsp/solver_logs/')
-		os.system("cp "+problem_name+".par "+'/pkg/gtsp/solver_logs/')
-
-		os.system("mv "+problem_name+".gtsp "+solver_loc)
-		os.system("mv "+problem_name+".par "+solver_loc+"TMP/")
-
-
-		cur_dir = os.getcwd()
-		os.chdir(solver_loc)
-		cmd = "./GLKH "+"TMP/"+problem_name+".par"
-	
-		#print("[%18s] Launching the GLKH solver."%time_keeping.current_time())
-		os.system(cmd)	
-		#print("[%18s] GLKH solver has finished."%time_keeping.current_time())
-
-		# Cleanup
-		#os.system("rm "+problem_name+".gtsp")
-		#os.system("rm "+"TMP/"+problem_name+".par")
-		os.system("mv "+problem_name+".gtsp "+cur_dir+"/pkg/gtsp/solver_logs")
-		os.system("mv "+"TMP/"+problem_name+".par "+cur_dir+"/pkg/gtsp/solver_logs")
-
-
-		# Move the resulting file to home folder
-		os.system("mv "+problem_name+".tour "+cur_dir+'/pkg/gtsp/solver_logs')
-
-		os.chdir(cur_dir)
+	return tour
 
 
 def read_tour(problem_name):
 
 	# Read in the results from the TSP solver results
-	with open('pkg/gtsp/solver_logs/'+problem_name+".tour", 'r') as f:
-		for i in range(6):
-			f.readline()
-
-		tour = []
-		str = f.readline()
-		while "EOF" not in str and "-1" not in str:
-			tour.append(int(str)-1)
-			str = f.readline()
-
-	return tour
\ No newline at end of file
+	return instance.parse_tour(os.path.join(LOG_DIR, problem_name+".tour"))
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath("../.."))
+
+		import instance
+		import runner
+		from discritizers import get_mapping
+		from gtsp.native import solver as native_solver
+else:
+	from . import instance
+	from . import runner
+	from ...discritizers import get_mapping
+	from ..native import solver as native_solver
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def optimize_directions(tour, cost_matrix, cluster_list):
+	"""
+	Re-pick the node of every cluster for a fixed order of clusters.
+
+	With the order fixed, choosing a direction per segment is a shortest
+	path through a chain of layers, one layer per cluster, solved exactly by
+	dynamic programming. The tour is closed, so the chain is solved once per
+	node of its smallest cluster, all of them at the same time. The work is
+	O(N*d^2) per start node for N clusters of at most d nodes, the result is
+	never worse than the given tour.
+
+	:param tour: List of node ids, one per cluster
+	:param cost_matrix: Matrix with costs
+	:param cluster_list: List of node ids per cluster
+	:return tour: List of node ids visiting the clusters in the same order
+	"""
+
+	if len(tour) < 2:
+		return list(tour)
+
+	cluster_of = {}
+	for cluster in cluster_list:
+		for node in cluster:
+			cluster_of[node] = cluster
+
+	# Start the chain at the smallest cluster
+	shift = int(np.argmin([len(cluster_of[node]) for node in tour]))
+	tour = list(tour[shift:])+list(tour[:shift])
+
+	layers = [np.asarray(cluster_of[node]) for node in tour]
+	first = layers[0]
+
+	# Cheapest cost from every start node to every node of the current layer
+	cost = _submatrix(cost_matrix, first, layers[1])
+	back = []
+	for k in range(2, len(layers)):
+		total = cost[:, :, np.newaxis] + _submatrix(cost_matrix, layers[k-1], layers[k])[np.newaxis]
+		back.append(np.argmin(total, axis=1))
+		cost = np.min(total, axis=1)
+
+	# Close the tour back to the start node
+	total = cost + _submatrix(cost_matrix, layers[-1], first).T
+	start, last = np.unravel_index(np.argmin(total), total.shape)
+
+	choice = [last]
+	for pointers in reversed(back):
+		choice.append(pointers[start, choice[-1]])
+	choice.append(start)
+	choice.reverse()
+
+	tour = [int(layer[i]) for layer, i in zip(layers, choice)]
+	return tour[len(tour)-shift:]+tour[:len(tour)-shift]
+
+
+def _submatrix(cost_matrix, rows, cols):
+	"""
+	Costs between two sets of nodes as an int64 array
+	"""
+
+	if hasattr(cost_matrix, 'edges'):
+		return np.array([cost_matrix.row(i)[cols] for i in rows], dtype=np.int64)
+
+	return np.asarray(cost_matrix)[np.ix_(rows, cols)].astype(np.int64)
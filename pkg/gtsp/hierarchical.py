@@ -0,0 +1,184 @@
+import multiprocessing
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+from shapely.geometry import Polygon
+
+
+# Default wall-clock budget of the sub-problem of every cell in seconds
+CELL_TIME_BUDGET = 2.0
+
+# Wall-clock budget of the tour over the cells in seconds
+ORDER_TIME_BUDGET = 1.0
+
+
+def solve(P, decomposition, adjacency_matrix, cells, radius,
+	cell_time_budget=CELL_TIME_BUDGET, workers=1, seed=None):
+	"""
+	Solve the coverage GTSP cell by cell.
+
+	The cells are first put in order by a small TSP over the adjacency graph
+	of the decomposition. Every cell is then solved on its own: a dummy
+	cluster anchored where the tour enters the cell from the previous one
+	and leaves it for the next one fixes both ends of its path. The cells
+	are independent and may be spread across a pool of processes. Their
+	paths are joined in cell order into one tour. The largest cell gets the
+	whole budget, smaller ones a share proportional to their number of
+	segments, so trivial cells do not hold up the solve.
+
+	:param P: Polygon in the standard form
+	:param decomposition: List of cells, polygons in the standard form
+	:param adjacency_matrix: Shared edges between cells, None if not adjacent
+	:param cells: List with the segments of each cell, as discritize_cells
+	:param radius: Turning radius
+	:param cell_time_budget: Budget of the solver of the largest cell in seconds
+	:param workers: Number of processes, None to use every core
+	:param seed: Seed of the random number generator
+	:return tour: List of node ids of get_mapping over all segments, taken
+		in the order of cells
+	"""
+
+	# Nodes of the cells follow each other in the global mapping
+	sizes = [sum([segment.dirs_num for segment in segments]) for segments in cells]
+	offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+	nonempty = [k for k in range(len(cells)) if cells[k]]
+	order = order_cells(decomposition, adjacency_matrix, nonempty, seed)
+
+	max_size = max([len(cells[k]) for k in order] or [1])
+
+	problems = []
+	for i, k in enumerate(order):
+		entry_point = get_anchor(decomposition, adjacency_matrix, order[i-1], k)
+		exit_point = get_anchor(decomposition, adjacency_matrix, k, order[(i+1)%len(order)])
+		time_budget = cell_time_budget*len(cells[k])/float(max_size)
+		problems.append((P, cells[k], radius, entry_point, exit_point, time_budget, seed))
+
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	workers = min(workers, len(problems))
+
+	if workers <= 1:
+		paths = [_solve_cell(problem) for problem in problems]
+	else:
+		pool = multiprocessing.Pool(workers)
+		try:
+			paths = pool.map(_solve_cell, problems, chunksize=1)
+		finally:
+			pool.close()
+			pool.join()
+
+	tour = []
+	for k, path in zip(order, paths):
+		tour.extend([int(offsets[k]+node) for node in path])
+
+	return tour
+
+
+def order_cells(decomposition, adjacency_matrix, cell_ids=None, seed=None):
+	"""
+	Order cells by a TSP over their centroids. Cells are connected through
+	the midpoints of their shared edges, non-adjacent cells by the shortest
+	path over the adjacency graph, or a straight line if there is none.
+
+	:param decomposition: List of cells, polygons in the standard form
+	:param adjacency_matrix: Shared edges between cells, None if not adjacent
+	:param cell_ids: Cells to order, all of them if None
+	:param seed: Seed of the random number generator
+	:return order: List of cell ids
+	"""
+
+	if cell_ids is None:
+		cell_ids = range(len(decomposition))
+	cell_ids = list(cell_ids)
+
+	if len(cell_ids) <= 3:
+		return cell_ids
+
+	num_cells = len(decomposition)
+	centroids = np.array([get_centroid(poly) for poly in decomposition])
+
+	weights = np.zeros((num_cells, num_cells))
+	for a in range(num_cells):
+		for b in range(num_cells):
+			if a != b and adjacency_matrix[a][b] is not None:
+				midpoint = np.mean(adjacency_matrix[a][b], axis=0)
+				weights[a, b] = np.linalg.norm(centroids[a]-midpoint) + \
+					np.linalg.norm(midpoint-centroids[b])
+
+	distances = shortest_path(weights, directed=False)
+	straight = np.linalg.norm(centroids[:, np.newaxis]-centroids[np.newaxis, :], axis=2)
+	distances = np.where(np.isinf(distances), straight, distances)
+
+	distances = distances[np.ix_(cell_ids, cell_ids)]
+	costs = np.round(100*distances).astype(int)
+
+	tour = native_solver.solve(costs, [[i] for i in range(len(cell_ids))],
+		ORDER_TIME_BUDGET, seed)
+
+	return [cell_ids[i] for i in tour]
+
+
+def get_centroid(poly):
+	"""
+	Centroid of a polygon in the standard form
+	"""
+
+	centroid = Polygon(*poly).centroid
+	return centroid.x, centroid.y
+
+
+def get_anchor(decomposition, adjacency_matrix, a, b):
+	"""
+	Point where the tour passes from cell a to cell b: the midpoint of their
+	shared edge, or halfway between their centroids if they are not adjacent
+	"""
+
+	if a == b:
+		return get_centroid(decomposition[a])
+
+	if adjacency_matrix[a][b] is not None:
+		return tuple(np.mean(adjacency_matrix[a][b], axis=0))
+
+	return tuple(np.mean([get_centroid(decomposition[a]), get_centroid(decomposition[b])], axis=0))
+
+
+def _solve_cell(problem):
+	"""
+	Path through the segments of one cell from its entry to its exit anchor
+	"""
+
+	P, segments, radius, entry_point, exit_point, time_budget, seed = problem
+
+	mapping = get_mapping.get_segment_array(segments)
+	cost, cluster_list = dubins_cost.compute_costs(P, mapping, radius)
+	exits, entrances = dubins_batch.get_poses(mapping)
+
+	# The dummy node closes the path from the exit back to the entry anchor
+	num_nodes = len(mapping)
+	dummy = num_nodes
+
+	costs = np.zeros((num_nodes+1, num_nodes+1), dtype=np.int64)
+	costs[:num_nodes, :num_nodes] = np.asarray(cost)
+	costs[dummy, :num_nodes] = 100*np.linalg.norm(entrances[:, :2]-np.asarray(entry_point), axis=1)
+	costs[:num_nodes, dummy] = 100*np.linalg.norm(exits[:, :2]-np.asarray(exit_point), axis=1)
+
+	tour = native_solver.solve(costs, cluster_list+[[dummy]], time_budget, seed)
+
+	i = tour.index(dummy)
+	return tour[i+1:]+tour[:i]
+
+
+if __name__ == '__main__':
+	if __package__ is None:
+		import os, sys
+		sys.path.insert(0, os.path.abspath(".."))
+
+		from costs import dubins_batch
+		from costs import dubins_cost
+		from discritizers import get_mapping
+		from gtsp.native import solver as native_solver
+else:
+	from ..costs import dubins_batch
+	from ..costs import dubins_cost
+	from ..discritizers import get_mapping
+	from .native import solver as native_solver
@@ -0,0 +1,295 @@
+import time
+import numpy as np
+
+
+# Default wall-clock budget of a solve in seconds
+DEFAULT_TIME_BUDGET = 10.0
+
+
+def solve(cost_matrix, cluster_list, time_budget=DEFAULT_TIME_BUDGET, seed=None,
+	initial_tour=None):
+	"""
+	In-process heuristic for the asymmetric GTSP.
+
+	A tour visiting one node per cluster is built by cheapest cluster
+	insertion and then improved by local search: cluster re-insertion
+	(Or-opt) with free choice of the node, asymmetric 2-opt and per-cluster
+	node re-selection. Once at a local optimum the best tour is perturbed
+	with a double bridge move and improved again until the time budget is
+	spent.
+
+	A previous tour, possibly missing some clusters, can be given to start
+	the search from instead of a fresh construction.
+
+	:param cost_matrix: (N, N) matrix of costs
+	:param cluster_list: List of node ids per cluster
+	:param time_budget: Wall-clock budget in seconds
+	:param seed: Seed of the random number generator
+	:param initial_tour: Node ids of a starting tour, at most one per cluster
+	:return tour: List of node ids, in the same format as read_tour
+	"""
+
+	deadline = time.time() + time_budget
+	rng = np.random.RandomState(seed)
+
+	C = _as_array(cost_matrix)
+	table, cluster_of = _cluster_table(cluster_list, len(C))
+
+	if initial_tour is not None:
+		tour = _complete(C, table, cluster_of, initial_tour)
+	else:
+		tour = _construct(C, table, rng)
+	tour = _local_search(C, table, cluster_of, tour, rng, deadline)
+
+	best = tour
+	best_cost = tour_cost(C, tour)
+	while time.time() < deadline and len(best) >= 4:
+		tour = _double_bridge(best, rng)
+		tour = _local_search(C, table, cluster_of, tour, rng, deadline)
+
+		cost = tour_cost(C, tour)
+		if cost < best_cost:
+			best = tour
+			best_cost = cost
+
+	return [int(node) for node in best]
+
+
+def complete_tour(cost_matrix, cluster_list, tour):
+	"""
+	Insert every cluster a partial tour misses at its cheapest position
+
+	:param cost_matrix: (N, N) matrix of costs
+	:param cluster_list: List of node ids per cluster
+	:param tour: Node ids of a partial tour, at most one per cluster
+	:return tour: List of node ids visiting every cluster
+	"""
+
+	C = _as_array(cost_matrix)
+	table, cluster_of = _cluster_table(cluster_list, len(C))
+
+	return [int(node) for node in _complete(C, table, cluster_of, tour)]
+
+
+def tour_cost(cost_matrix, tour):
+	"""
+	Total cost of a closed tour
+
+	:param cost_matrix: (N, N) matrix of costs
+	:param tour: Sequence of node ids
+	:return cost: Sum of the costs of all transitions, closing one included
+	"""
+
+	C = _as_array(cost_matrix)
+	tour = np.asarray(tour, dtype=int)
+	return int(C[tour, np.roll(tour, -1)].astype(np.int64).sum())
+
+
+def _as_array(cost_matrix):
+	"""
+	Dense ndarray of costs, sparse matrices are expanded with their penalty
+	"""
+
+	if hasattr(cost_matrix, 'edges'):
+		rows, cols, costs = cost_matrix.edges()
+
+		C = np.full((len(cost_matrix), len(cost_matrix)), cost_matrix.default,
+			dtype=costs.dtype)
+		C[rows, cols] = costs
+		return C
+
+	return np.asarray(cost_matrix)
+
+
+def _cluster_table(cluster_list, num_nodes):
+	"""
+	Pad clusters into a rectangular table by repeating their first node
+	"""
+
+	width = max(len(cluster) for cluster in cluster_list)
+
+	table = np.empty((len(cluster_list), width), dtype=int)
+	cluster_of = np.empty(num_nodes, dtype=int)
+	for i, cluster in enumerate(cluster_list):
+		table[i, :] = cluster[0]
+		table[i, :len(cluster)] = cluster
+		cluster_of[cluster] = i
+
+	return table, cluster_of
+
+
+def _costs(C, a, b):
+	return C[a, b].astype(np.int64)
+
+
+def _construct(C, table, rng):
+	"""
+	Cheapest insertion of the clusters in a random order
+	"""
+
+	order = rng.permutation(len(table))
+
+	tour = np.array([table[order[0], 0]])
+	for c in order[1:]:
+		tour = _insert(C, tour, table[c])
+
+	return tour
+
+
+def _complete(C, table, cluster_of, tour):
+	"""
+	Cheapest insertion of the clusters missing from a partial tour
+	"""
+
+	tour = np.asarray(tour, dtype=int)
+	if not len(tour):
+		tour = table[:1, 0]
+
+	missing = np.ones(len(table), dtype=bool)
+	missing[cluster_of[tour]] = False
+	for c in np.nonzero(missing)[0]:
+		tour = _insert(C, tour, table[c])
+
+	return tour
+
+
+def _insert(C, tour, candidates):
+	"""
+	Insert the cheapest of the candidate nodes at its cheapest position
+	"""
+
+	a = tour; b = np.roll(tour, -1)
+
+	delta = _costs(C, a[:, np.newaxis], candidates[np.newaxis, :]) + \
+		_costs(C, candidates[np.newaxis, :], b[:, np.newaxis]) - \
+		_costs(C, a, b)[:, np.newaxis]
+
+	pos, k = np.unravel_index(np.argmin(delta), delta.shape)
+	return np.insert(tour, pos+1, candidates[k])
+
+
+def _local_search(C, table, cluster_of, tour, rng, deadline):
+	"""
+	Apply improving moves until none is left or time runs out
+	"""
+
+	improved = True
+	while improved and time.time() < deadline:
+		tour = _reselect_nodes(C, table, cluster_of, tour)
+
+		improved, tour = _or_opt(C, table, cluster_of, tour, rng, deadline)
+		if not improved:
+			improved, tour = _two_opt(C, tour, deadline)
+
+	return tour
+
+
+def _reselect_nodes(C, table, cluster_of, tour):
+	"""
+	Pick the best node of every cluster for fixed neighbours. Positions of
+	the same parity do not neighbour each other and are updated together.
+	On an odd tour the last position neighbours the first one, so it is
+	updated in a pass of its own.
+	"""
+
+	tour = tour.copy()
+	num = len(tour)
+	if num < 3:
+		return tour
+
+	passes = [np.arange(0, num-num%2, 2), np.arange(1, num, 2)]
+	if num % 2:
+		passes.append(np.array([num-1]))
+
+	for pos in passes:
+		prev = tour[pos-1]; nxt = tour[(pos+1) % num]
+		candidates = table[cluster_of[tour[pos]]]
+
+		delta = _costs(C, prev[:, np.newaxis], candidates) + \
+			_costs(C, candidates, nxt[:, np.newaxis])
+		tour[pos] = candidates[np.arange(len(pos)), np.argmin(delta, axis=1)]
+
+	return tour
+
+
+def _or_opt(C, table, cluster_of, tour, rng, deadline):
+	"""
+	Move single clusters to their cheapest position and node
+	"""
+
+	improved = False
+	if len(tour) < 4:
+		return improved, tour
+
+	for c in rng.permutation(len(table)):
+		if time.time() > deadline:
+			break
+
+		num = len(tour)
+		i = np.nonzero(cluster_of[tour] == c)[0][0]
+		prev = tour[i-1]; node = tour[i]; nxt = tour[(i+1) % num]
+
+		gain = int(C[prev, node]) + int(C[node, nxt]) - int(C[prev, nxt])
+
+		rest = np.delete(tour, i)
+		a = rest; b = np.roll(rest, -1)
+		candidates = table[c]
+
+		delta = _costs(C, a[:, np.newaxis], candidates[np.newaxis, :]) + \
+			_costs(C, candidates[np.newaxis, :], b[:, np.newaxis]) - \
+			_costs(C, a, b)[:, np.newaxis]
+
+		pos, k = np.unravel_index(np.argmin(delta), delta.shape)
+		if delta[pos, k] < gain:
+			tour = np.insert(rest, pos+1, candidates[k])
+			improved = True
+
+	return improved, tour
+
+
+def _two_opt(C, tour, deadline):
+	"""
+	Apply the best asymmetric 2-opt move found for the first improving
+	starting position. Reversed segments are costed in their new direction.
+	"""
+
+	num = len(tour)
+	if num < 4:
+		return False, tour
+
+	nxt = np.roll(tour, -1)
+	forward = np.concatenate(([0], np.cumsum(_costs(C, tour, nxt))))
+	backward = np.concatenate(([0], np.cumsum(_costs(C, nxt, tour))))
+
+	for i in range(num-2):
+		if time.time() > deadline:
+			break
+
+		last = num-1 if i > 0 else num-2
+		j = np.arange(i+2, last+1)
+		if not len(j):
+			continue
+
+		a = tour[i]; b = tour[i+1]
+		c = tour[j]; d = tour[(j+1) % num]
+
+		delta = _costs(C, a, c) + _costs(C, b, d) - int(C[a, b]) - _costs(C, c, d) + \
+			(backward[j] - backward[i+1]) - (forward[j] - forward[i+1])
+
+		k = np.argmin(delta)
+		if delta[k] < 0:
+			tour = tour.copy()
+			tour[i+1:j[k]+1] = tour[i+1:j[k]+1][::-1]
+			return True, tour
+
+	return False, tour
+
+
+def _double_bridge(tour, rng):
+	"""
+	Reconnect four random pieces A B C D of the tour as A C B D
+	"""
+
+	cuts = np.sort(rng.choice(np.arange(1, len(tour)), 3, replace=False))
+	a, b, c = cuts
+	return np.concatenate((tour[:a], tour[b:c], tour[a:b], tour[c:]))
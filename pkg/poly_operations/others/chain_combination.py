@@ -22,8 +22,8 @@ def combine_chains(P, theta):
 
 	# Loop over the whole chain dict except the last case
 	for i in range(len(chains)-1):
-		chain = chains[i]
-		R = reflex.find_reflex_vertices([chain, []])
+		cur_chain = chains[i]
+		R = reflex.find_reflex_vertices([cur_chain, []])
 
 		for v in R:
 			#print("Reflex v: %s"%(v,))
@@ -72,13 +72,13 @@ def combine_chains(P, theta):
 
 		#print("Cut Param: %s"%(cut_parameters,))
 		#print("Cutting from: %s to %s"%(v, cut_parameters))
-		orig_chain = LineString(chain+[chain[0]])
-		dest_chain = LineString(chains[cut_parameters[1]]+[chains[cut_parameters[1]][0]])
+		orig_chain = chain.Chain(cur_chain+[cur_chain[0]])
+		dest_chain = chain.Chain(chains[cut_parameters[1]]+[chains[cut_parameters[1]][0]])
 		#print("Orig chain: %s"%orig_chain)
 		#print("Dest chain: %s"%dest_chain)
 
-		distance_to_v = orig_chain.project(Point(v[1]))
-		distance_to_w = dest_chain.project(Point(cut_parameters[0]))
+		distance_to_v = orig_chain.project(v[1])
+		distance_to_w = dest_chain.project(cut_parameters[0])
 		#print("Dist_v: %2f, Dist_w: %2f"%(distance_to_v, distance_to_w))
 		#print("Orig_l: %2f, Dist_l: %2f"%(orig_chain.length, dest_chain.length))
 
@@ -87,16 +87,13 @@ def combine_chains(P, theta):
 			orig_chain_2 = [];
 		else:
 			orig_chain_1, orig_chain_2 = cut(orig_chain, distance_to_v)
-			orig_chain_1 = orig_chain_1.coords[:]
-			orig_chain_2 = orig_chain_2.coords[:]
 
 		if distance_to_w == 0:
 			dest_chain_1 = [];
 			dest_chain_2 = dest_chain.coords[:]
 		else:
 			dest_chain_1, dest_chain_2 = cut(dest_chain, distance_to_w)
-			dest_chain_1 = dest_chain_1.coords[:]
-			dest_chain_2 = dest_chain_2.coords[:-1]
+			dest_chain_2 = dest_chain_2[:-1]
 			#print cut(dest_chain, distance_to_w)
 
 		#if LinearRing(dest_chain).is_ccw:
@@ -143,45 +140,22 @@ def get_points_from_intersection(intersection):
 		return points
 
 
-def cut(line, distance):
+def cut(boundary, distance):
 	"""
-	Splicing a line
-	Credits go to author of the shapely manual
+	Splicing a chain at a distance along it, located by binary search over
+	the cumulative arc lengths of the chain
+	:param boundary: chain.Chain to cut
+	:param distance: distance from the start of the chain
+	:return left, right: lists of coordinates on both sides of the cut
 	"""
 	# Cuts a line in two at a distance from its starting point
-	if distance <= 0.0 or distance >= line.length:
+	if distance <= 0.0 or distance >= boundary.length:
 		print("ERROR: CUT BEYONG LENGTH")
-		print line
+		print boundary.coords
 		print(distance)
-		return [LineString(line), []]
-
-	coords = list(line.coords)
-	#print("Coords: %s"%(coords,))
-	pd = 0
-	#for i, p in enumerate(coords):
-	for i in range(len(coords)):
-		if i > 0:
-			pd = LineString(coords[:i+1]).length
-		#print i,coords[:i+1]
-		#pd = line.project(Point(p))
-		#print pd
-		if pd == distance:
-			return [
-				LineString(coords[:i+1]),
-				LineString(coords[i:])]
-		if pd > distance:
-			#print("This case")
-			cp = line.interpolate(distance)
-			#print("cp: %s"%(cp,))
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
-		if i == len(coords)-1:
-			cp = line.interpolate(distance)
-			return [
-				LineString(coords[:i] + [(cp.x, cp.y)]),
-				LineString([(cp.x, cp.y)] + coords[i:])]
+		return [boundary.coords[:], []]
 
+	return boundary.cut(distance)
 
 
 #def cut(line, distance):
@@ -217,9 +191,11 @@ if __name__ == '__main__':
 		import os, sys
 		sys.path.insert(0, os.path.abspath("../.."))
 		from aux.geometry import rotation
+		from aux.geometry import chain
 		import reflex
 		
 		print combine_chains([[(0,0)],[]], 0)
 else:
 	from ...aux.geometry import rotation
+	from ...aux.geometry import chain
 	import reflex
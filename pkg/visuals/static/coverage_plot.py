@@ -82,6 +82,13 @@ def plot_samples(ax, segments):
 
 	from ...discritizers import classes
 
+	if isinstance(segments, classes.SegmentArray):
+		points = segments.kinds == segments.POINT
+		ax.scatter(segments.starts[points, 0], segments.starts[points, 1], color='orange', alpha=0.9, linewidth=3, zorder=3)
+		for start, end in zip(segments.starts[~points], segments.ends[~points]):
+			ax.plot([start[0], end[0]], [start[1], end[1]], color='orange', alpha=0.9, linewidth=3, zorder=3)
+		return
+
 	for segment in segments:
 		if isinstance(segment, classes.PointSegment):
 			x, y = segment.coord
@@ -190,16 +197,17 @@ def plot_tour_dubins(ax, tour, dict_map, r):
 	import math
 	import dubins
 
+	if hasattr(dict_map, 'exit_poses'):
+		exits = dict_map.exit_poses()[tour].tolist()
+		entrances = dict_map.entrance_poses()[tour].tolist()
+	else:
+		exits = [dict_map[node][0].get_exit_info(dict_map[node][1]) for node in tour]
+		entrances = [dict_map[node][0].get_entrance_info(dict_map[node][1]) for node in tour]
+
 	n = len(tour)
 	for i in range(len(tour)):
-		outgoing_node_idx = tour[i]
-		incoming_node_idx = tour[(i+1)%n]
-
-		outgoing_segment, dir_o = dict_map[outgoing_node_idx]
-		incoming_segment, dir_i = dict_map[incoming_node_idx]
-
-		q0 = outgoing_segment.get_exit_info(dir_o)
-		q1 = incoming_segment.get_entrance_info(dir_i)
+		q0 = tuple(exits[i])
+		q1 = tuple(entrances[(i+1)%n])
 		smpls, _ = dubins.path_sample(q0, q1, r, 0.05)
 
 		x = []
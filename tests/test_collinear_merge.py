@@ -0,0 +1,50 @@
+import math
+import unittest
+
+from pkg.decompositions import adjacency
+from pkg.discritizers.line import collinear_merge
+from pkg.discritizers.line import min_alt_discrt
+
+
+WIDTH = 0.4
+
+
+class MergeCellsTest(unittest.TestCase):
+
+	def merge(self, decomposition):
+		adjacency_matrix = adjacency.get_adjacency_as_matrix(decomposition)
+		cells = [min_alt_discrt.discritize(P, WIDTH, math.pi/2) for P in decomposition]
+
+		return cells, collinear_merge.merge_cells(cells, adjacency_matrix, WIDTH)
+
+	def test_adjacency_matrix_holds_shared_edges(self):
+		decomposition = [[[(0, 0), (5, 0), (5, 2), (0, 2)], []],
+			[[(5, 0), (10, 0), (10, 2), (5, 2)], []],
+			[[(20, 0), (25, 0), (25, 2), (20, 2)], []]]
+
+		adjacency_matrix = adjacency.get_adjacency_as_matrix(decomposition)
+
+		self.assertEqual(sorted(adjacency_matrix[0][1]), [(5.0, 0.0), (5.0, 2.0)])
+		self.assertEqual(adjacency_matrix[1][0], adjacency_matrix[0][1])
+		self.assertIsNone(adjacency_matrix[0][2])
+		self.assertIsNone(adjacency_matrix[1][2])
+
+	def test_lines_merged_across_shared_edge(self):
+		cells, segments = self.merge([[[(0, 0), (5, 0), (5, 2), (0, 2)], []],
+			[[(5, 0), (10, 0), (10, 2), (5, 2)], []]])
+
+		self.assertEqual(len(segments), len(cells[0]))
+		for segment in segments:
+			xs = sorted(x for x, y in segment.coords)
+			self.assertAlmostEqual(xs[0], WIDTH/2)
+			self.assertAlmostEqual(xs[1], 10-WIDTH/2)
+
+	def test_cells_without_shared_edge_kept_apart(self):
+		cells, segments = self.merge([[[(0, 0), (5, 0), (5, 2), (0, 2)], []],
+			[[(5.2, 0), (10, 0), (10, 2), (5.2, 2)], []]])
+
+		self.assertEqual(len(segments), len(cells[0])+len(cells[1]))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,48 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pkg.aux.cache import npz_cache
+from pkg.costs import cost_cache
+from pkg.discritizers import classes
+from pkg.discritizers import get_mapping
+
+
+P = [[(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (6, 4), (6, 6), (4, 6)]]]
+
+
+def lines(ys, x0=1, x1=9):
+	return [classes.LineSegment([(x0, y), (x1, y)]) for y in ys]
+
+
+class UpdateCostsTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.cache = npz_cache.NpzCache(self.directory)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def test_update_matches_full_computation(self):
+		old_mapping = get_mapping.get_segment_array(lines([1, 2, 3, 7, 8]))
+		mapping = get_mapping.get_segment_array(lines([1, 2, 3]) + lines([7.5, 8.5], 2, 8))
+
+		for mode in ('dense', 'geodesic'):
+			old_cost, _ = cost_cache.compute_costs(self.cache, P, old_mapping, 0.5, mode)
+			cost, cluster_list = cost_cache.update_costs(self.cache, P, old_mapping, mapping,
+				old_cost, 0.5, mode)
+
+			misses = self.cache.misses
+			expected, expected_clusters = cost_cache.compute_costs(self.cache, P, mapping, 0.5, mode)
+
+			# The updated matrix was stored under the same key
+			self.assertEqual(self.cache.misses, misses)
+			np.testing.assert_array_equal(np.asarray(cost), np.asarray(expected))
+			self.assertEqual(cluster_list, expected_clusters)
+
+
+if __name__ == '__main__':
+	unittest.main()
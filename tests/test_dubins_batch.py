@@ -0,0 +1,57 @@
+import math
+import unittest
+
+import numpy as np
+
+from pkg.costs import dubins_batch
+
+try:
+	import dubins
+except ImportError:
+	dubins = None
+
+
+@unittest.skipIf(dubins is None, "the dubins library is not installed")
+class PathLengthsTest(unittest.TestCase):
+
+	def check(self, q0, q1, rho):
+		lengths = dubins_batch.path_lengths(q0, q1, rho)
+
+		for i in range(len(q0)):
+			expected = dubins.path_length(tuple(q0[i]), tuple(q1[i]), rho)
+			self.assertAlmostEqual(lengths[i], expected, delta=1e-9*max(1.0, expected))
+
+	def test_random_pairs(self):
+		rng = np.random.RandomState(0)
+
+		num = 2000
+		q0 = np.column_stack((rng.uniform(-10, 10, (num, 2)), rng.uniform(-math.pi, math.pi, num)))
+		q1 = np.column_stack((rng.uniform(-10, 10, (num, 2)), rng.uniform(-math.pi, math.pi, num)))
+
+		for rho in (0.2, 1.0, 5.0):
+			self.check(q0, q1, rho)
+
+	def test_close_pairs(self):
+		# Poses closer than the turning radius exercise the RLR and LRL words
+		rng = np.random.RandomState(1)
+
+		num = 2000
+		q0 = np.column_stack((rng.uniform(-1, 1, (num, 2)), rng.uniform(0, 2*math.pi, num)))
+		q1 = np.column_stack((q0[:, :2]+rng.uniform(-0.5, 0.5, (num, 2)), rng.uniform(0, 2*math.pi, num)))
+
+		self.check(q0, q1, 1.0)
+
+	def test_broadcast(self):
+		q0 = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 1.5]])
+		q1 = np.array([[3.0, 1.0, -1.0], [0.5, 0.5, 2.5], [-2.0, 4.0, 0.0]])
+
+		lengths = dubins_batch.path_lengths(q0[:, np.newaxis, :], q1[np.newaxis, :, :], 0.5)
+
+		self.assertEqual(lengths.shape, (2, 3))
+		for i in range(2):
+			for j in range(3):
+				self.assertAlmostEqual(lengths[i, j], dubins.path_length(tuple(q0[i]), tuple(q1[j]), 0.5))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pkg.costs import cost_matrix
+from pkg.gtsp.GLKH import instance
+
+
+class WriteProblemTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'problem.gtsp')
+
+		self.costs = np.array([[0, 3, 4], [3, 0, 5], [4, 5, 0]])
+		self.clusters = [[0], [1, 2]]
+
+	def tearDown(self):
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+	def header(self):
+		with open(self.filename) as f:
+			return dict(line.strip().split(' = ') for line in f if ' = ' in line)
+
+	def test_symmetry_detected(self):
+		instance.write_problem(self.filename, 'test', self.costs, self.clusters)
+
+		self.assertEqual(self.header()['EDGE_WEIGHT_FORMAT'], 'LOWER_DIAG_ROW')
+
+	def test_symmetry_taken_from_cost_matrix(self):
+		costs = cost_matrix.CostMatrix.from_array(self.costs)
+		costs.symmetric = False
+
+		is_symmetric = instance.is_symmetric
+		instance.is_symmetric = None
+		try:
+			instance.write_problem(self.filename, 'test', costs, self.clusters)
+		finally:
+			instance.is_symmetric = is_symmetric
+
+		self.assertEqual(self.header()['EDGE_WEIGHT_FORMAT'], 'FULL_MATRIX')
+		self.assertEqual(self.header()['TYPE'], 'AGTSP')
+
+
+if __name__ == '__main__':
+	unittest.main()
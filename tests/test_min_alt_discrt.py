@@ -0,0 +1,149 @@
+import unittest
+
+import numpy as np
+from shapely.geometry import LinearRing
+from shapely.geometry import LineString
+from shapely.geometry import Polygon
+
+from pkg.aux.geometry import rotation
+from pkg.discritizers.line import min_alt_discrt
+
+
+def reference_pieces(polygon, sweep_xs):
+	"""
+	Pieces of every sweep line inside a polygon as shapely computes them
+	"""
+
+	miny, maxy = polygon.bounds[1]-1, polygon.bounds[3]+1
+
+	pieces = []
+	for x in sweep_xs:
+		intersection = polygon.intersection(LineString([(x, miny), (x, maxy)]))
+		for part in getattr(intersection, 'geoms', [intersection]):
+			if part.is_empty:
+				continue
+			ys = [y for _, y in part.coords]
+			pieces.append((x, min(ys), max(ys)))
+
+	return sorted(pieces)
+
+
+def old_line_generator(P, width, theta):
+	"""
+	The line generator the scanline replaced: a shapely intersection of the
+	shrunk polygon with every sweep line, stepped across it one at a time
+	"""
+
+	P = rotation.rotate_polygon(P, -theta)
+
+	ext = LinearRing(P[0]).parallel_offset(width/2, side='left', join_style=1)
+	holes = [LinearRing(hole).parallel_offset(width/2, side='left', join_style=1) for hole in P[1]]
+	shrunk_polygon = Polygon(ext.coords, [hole.coords for hole in holes])
+	minx, miny, maxx, maxy = shrunk_polygon.bounds
+
+	sweep_xs = []
+	cur_x = minx
+	finishing_touches = False
+	while (cur_x <= maxx) or (finishing_touches):
+		if finishing_touches:
+			cur_x = maxx-0.001
+
+		sweep_xs.append(cur_x+0.001 if cur_x == minx else cur_x)
+		cur_x += width
+		finishing_touches = (cur_x > maxx) and (cur_x <= maxx+width/2)
+
+	pieces = []
+	for x, y0, y1 in reference_pieces(shrunk_polygon, sweep_xs):
+		pieces.append(rotation.rotate_points([(x, y0), (x, y1)], theta))
+
+	return canonical(pieces)
+
+
+def canonical(pieces):
+	"""
+	Pieces as rounded, undirected, sorted tuples, so float noise does not
+	change their order
+	"""
+
+	return sorted(tuple(sorted((round(x, 6), round(y, 6)) for x, y in piece)) for piece in pieces)
+
+
+class SweepPositionsTest(unittest.TestCase):
+
+	def test_finishing_line_on_half_width_remainder(self):
+		# The extent of 4.6 leaves exactly half a width after the last line
+		sweep_xs = min_alt_discrt.get_sweep_positions(0.2, 4.8, 0.4)
+
+		self.assertEqual(len(sweep_xs), 13)
+		self.assertAlmostEqual(sweep_xs[-1], 4.799)
+
+	def test_line_counts(self):
+		for width in (0.1, 0.2, 0.3, 0.4, 0.7, 1.0):
+			for k in range(1, 40):
+				minx = 0.5*width
+
+				# Exact multiple, the last regular line lands on the bound
+				sweep_xs = min_alt_discrt.get_sweep_positions(minx, minx+k*width, width)
+				self.assertEqual(len(sweep_xs), k+1)
+				self.assertLessEqual(abs(sweep_xs[-1]-(minx+k*width)), 0.001+1e-9)
+
+				# Half a width left over, a finishing line is added
+				maxx = minx+(k+0.5)*width
+				sweep_xs = min_alt_discrt.get_sweep_positions(minx, maxx, width)
+				self.assertEqual(len(sweep_xs), k+2)
+				self.assertAlmostEqual(sweep_xs[-1], maxx-0.001)
+
+	def test_rectangle_cell(self):
+		segments = min_alt_discrt.populate_with_lines([[(0, 0), (5, 0), (5, 2), (0, 2)], []], 0.4, 0)
+
+		self.assertEqual(len(segments), 13)
+
+
+class SweepRingsTest(unittest.TestCase):
+
+	POLYGONS = [
+		[[(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (6, 4), (6, 6), (4, 6)]]],
+		[[(0, 0), (10, 0), (4.8, 5), (10, 10), (0, 10)], []],
+		[[(0, 0), (6, 0), (6, 2), (2, 2), (2, 6), (0, 6)], []],
+		[[(0, 0), (8, 1), (9, 7), (3, 9), (-1, 5)], [[(2, 2), (4, 2), (3, 4)], [(5, 4), (7, 5), (5, 6)]]],
+	]
+
+	def test_matches_shapely_intersection(self):
+		for exterior, holes in self.POLYGONS:
+			polygon = Polygon(exterior, holes)
+			minx, _, maxx, _ = polygon.bounds
+
+			# Widths keeping the lines off the vertices
+			for width in (0.37, 0.53, 0.91):
+				sweep_xs = min_alt_discrt.get_sweep_positions(minx, maxx, width)
+
+				rings = [polygon.exterior.coords]
+				rings.extend([interior.coords for interior in polygon.interiors])
+				lines, starts, ends = min_alt_discrt.sweep_rings(rings, sweep_xs)
+
+				pieces = sorted(zip(sweep_xs[lines].tolist(), starts[:, 1].tolist(), ends[:, 1].tolist()))
+				expected = reference_pieces(polygon, sweep_xs)
+
+				self.assertEqual(len(pieces), len(expected))
+				np.testing.assert_allclose(np.array(pieces), np.array(expected), atol=1e-9)
+
+
+	def test_matches_old_line_generator(self):
+		polygons = [
+			[[(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (6, 4), (6, 6), (4, 6)]]],
+			[[(0, 0), (10, 0), (4.8, 5), (10, 10), (0, 10)], []],
+			[[(0, 0), (6, 0), (6, 2), (2, 2), (2, 6), (0, 6)], []],
+		]
+
+		for P in polygons:
+			for theta in (0.3, 1.1, 2.5):
+				segments = min_alt_discrt.populate_with_lines(P, 0.37, theta)
+				pieces = canonical([segment.coords for segment in segments])
+				expected = old_line_generator(P, 0.37, theta)
+
+				self.assertEqual(len(pieces), len(expected))
+				np.testing.assert_allclose(np.array(pieces), np.array(expected), atol=2e-6)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from pkg.gtsp.native import solver
+
+
+class ReselectNodesTest(unittest.TestCase):
+
+	def test_last_position_of_odd_tour(self):
+		# Three clusters of two nodes, only node 5 of the last cluster is cheap
+		cluster_list = [[0, 1], [2, 3], [4, 5]]
+		C = np.full((6, 6), 10)
+		C[5, :] = 1
+		C[:, 5] = 1
+		np.fill_diagonal(C, 0)
+
+		table, cluster_of = solver._cluster_table(cluster_list, 6)
+		tour = solver._reselect_nodes(C, table, cluster_of, np.array([0, 2, 4]))
+
+		self.assertEqual(tour[-1], 5)
+
+
+class SolveTest(unittest.TestCase):
+
+	def check_tour(self, tour, cluster_list):
+		cluster_of = {}
+		for i, cluster in enumerate(cluster_list):
+			for node in cluster:
+				cluster_of[node] = i
+
+		self.assertEqual(sorted(cluster_of[node] for node in tour), list(range(len(cluster_list))))
+
+	def test_one_node_per_cluster(self):
+		rng = np.random.RandomState(0)
+
+		for num_clusters in (1, 2, 3, 4, 7, 20):
+			sizes = rng.randint(1, 5, num_clusters)
+			nodes = rng.permutation(sizes.sum())
+			cluster_list = [nodes[start:start+size].tolist()
+				for start, size in zip(np.cumsum(sizes)-sizes, sizes)]
+
+			C = rng.randint(1, 1000, (len(nodes), len(nodes)))
+			tour = solver.solve(C, cluster_list, time_budget=0.1, seed=num_clusters)
+
+			self.check_tour(tour, cluster_list)
+
+	def test_initial_tour_completed(self):
+		rng = np.random.RandomState(1)
+		cluster_list = [[2*i, 2*i+1] for i in range(10)]
+		C = rng.randint(1, 1000, (20, 20))
+
+		# Start from a partial tour missing most clusters
+		tour = solver.solve(C, cluster_list, time_budget=0.1, seed=0, initial_tour=[0, 5, 9])
+
+		self.check_tour(tour, cluster_list)
+
+
+if __name__ == '__main__':
+	unittest.main()
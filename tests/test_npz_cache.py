@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pkg.aux.cache import npz_cache
+
+
+class NpzCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		self.root = tempfile.mkdtemp()
+		self.directory = os.path.join(self.root, 'cache')
+
+	def tearDown(self):
+		shutil.rmtree(self.root, ignore_errors=True)
+
+	def test_directory_created_on_first_write(self):
+		cache = npz_cache.NpzCache(self.directory)
+		self.assertIsNone(cache.get('key'))
+		self.assertFalse(os.path.exists(self.directory))
+
+		cache.put('key', costs=np.arange(3))
+		self.assertTrue(os.path.isdir(self.directory))
+		self.assertEqual(cache.get('key')['costs'].tolist(), [0, 1, 2])
+
+
+if __name__ == '__main__':
+	unittest.main()
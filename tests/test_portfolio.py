@@ -0,0 +1,62 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import numpy as np
+
+from pkg.gtsp.GLKH import portfolio
+
+
+# Stand-in for GLKH: fails on seed 1, otherwise visits the first node of
+# every cluster
+FAKE_GLKH = """#!/bin/sh
+par="$1"
+prob=$(grep PROBLEM_FILE "$par" | sed 's/.*= //')
+tour=$(grep OUTPUT_TOUR_FILE "$par" | sed 's/.*= //')
+seed=$(grep '^SEED' "$par" | sed 's/.*= //')
+[ "$seed" = "1" ] && exit 1
+{
+echo "TOUR_SECTION"
+awk '/GTSP_SET_SECTION/{f=1;next} /EOF/{f=0} f{print $2}' "$prob"
+echo "-1"; echo "EOF"
+} > "$tour"
+"""
+
+
+class PortfolioTest(unittest.TestCase):
+
+	def setUp(self):
+		self.solver_loc = tempfile.mkdtemp()
+
+		binary = os.path.join(self.solver_loc, 'GLKH')
+		with open(binary, 'w') as f:
+			f.write(FAKE_GLKH)
+		os.chmod(binary, os.stat(binary).st_mode | stat.S_IEXEC)
+
+	def tearDown(self):
+		shutil.rmtree(self.solver_loc, ignore_errors=True)
+
+	def test_failed_run_is_ignored(self):
+		cost_matrix = np.array([[0, 1, 5, 9], [1, 0, 2, 8], [5, 2, 0, 1], [9, 8, 1, 0]])
+		cluster_list = [[0, 1], [2, 3]]
+
+		tour, settings = portfolio.solve('failing', self.solver_loc, cost_matrix,
+			cluster_list, deadline=10, configs=[{}], seeds=[1, 2], workers=2)
+
+		self.assertEqual(tour, [0, 2])
+		self.assertEqual(settings['SEED'], 2)
+
+	def test_all_runs_failing(self):
+		cost_matrix = np.array([[0, 1], [1, 0]])
+
+		tour, settings = portfolio.solve('failing', self.solver_loc, cost_matrix,
+			[[0], [1]], deadline=10, configs=[{}], seeds=[1])
+
+		self.assertIsNone(tour)
+		self.assertIsNone(settings)
+
+
+if __name__ == '__main__':
+	unittest.main()